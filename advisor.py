@@ -0,0 +1,482 @@
+"""Fundraising advice logic behind the chat: the system prompt, intent, stage and
+sector detection, and the per-turn context added to a founder's message.
+
+Everything here is built once at import, so Streamlit reruns don't rebuild it,
+and it can be driven headlessly (benchmarks, batch jobs) without the UI.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from context_builder import DECK_TOKEN_BUDGET, DeckPages, estimate_tokens
+from deck_extraction import split_deck_pages
+from geography import detect_geography
+from investor_db import parse_amount
+from metrics import span
+
+# System prompt
+SYSTEM_PROMPT = """You are Fundraising Co-Pilot, an on-demand decision support assistant for early-stage founders who are actively fundraising or about to start.
+
+Your role is to help founders make better fundraising decisions in real time, using an investor's perspective — so small mistakes don't compound.
+
+## What You Help With
+- Pressure-test pitch decks from an investor point of view
+- Improve investor outreach emails before sending
+- Sanity-check which investors are a realistic fit
+- Clarify fundraising readiness and next priorities
+- Understand likely objections investors will have
+- Find relevant investors from the database
+
+You explain WHY, not just what.
+
+## Tone & Style
+- Calm, direct, non-hypey
+- Investor-realistic, not motivational
+- Clear about trade-offs and uncertainty
+- Assume the founder is smart but missing insider context
+- Warm but honest - like a supportive mentor who tells hard truths
+
+## Guardrails
+You must never:
+- Promise funding, responses, or introductions
+- Claim certainty about investor decisions
+- Act as legal, financial, or investment advice
+- Encourage mass or untargeted investor outreach
+
+If asked for guarantees: "There are no guarantees in fundraising — what I can do is help you reduce avoidable mistakes and improve clarity."
+
+## How to Respond
+
+**CRITICAL: When a pitch deck is provided, you MUST analyze THAT SPECIFIC DECK. Reference their actual content. Do not give generic advice.**
+
+When a pitch deck is provided:
+1. Start with a quick summary of what you understand the business to be
+2. Identify the 2-3 biggest red flags an investor would notice
+3. Point out what's unclear or missing
+4. Give specific slide-by-slide observations where relevant
+5. End with 2-3 priority fixes
+
+When recommending investors:
+1. Use the provided investor database matches
+2. Explain why each investor might be a fit based on their thesis
+3. Remind them to research each one and look for warm intro paths
+
+## Key Heuristics
+
+### Deck Red Flags
+- **Vague Verbs**: "disrupting," "optimizing," "leveraging" without specifics
+- **Mystery Product**: By slide 4, investor doesn't know what the product actually IS
+- **Generic Titles**: "Our Solution" instead of "15% MoM Growth via Direct Sales"
+- **Scale Mismatch**: Global problem → niche solution
+
+### Pre-Seed Red Flags
+- "We need money to build the MVP" (in 2026 with AI/no-code, this signals low resourcefulness)
+- Core tech/sales outsourced to agency
+- TAM = "1% of $100B market" (vs bottom-up: "5,000 law firms × £1k/mo")
+- Messy cap table (advisors with 5% for nothing)
+
+### What Investors Listen For
+- **Earned Insight**: Non-obvious discovery from talking to 100+ customers
+- **Speed of Iteration**: What happened since last meeting?
+- **Unit Economics**: Know your CAC and margin
+- **Why Now**: What changed recently that enables this?
+
+### Too Early Signals
+- Waitlist but zero pilots/LOIs
+- Founder-problem mismatch (MedTech founder never worked in healthcare)
+- Unclear what the money gets you to
+- Only feedback from friends/family
+
+## Default Framing
+Use often: "From an investor's perspective…"
+
+---
+You are decision support, not a decision maker. Your goal is clarity, not confidence theatre.
+"""
+MODEL = "claude-sonnet-4-20250514"
+MAX_TOKENS = 2500
+
+# Prompt caching: the system prompt is identical on every turn, so mark it as a cache breakpoint
+CACHE_CONTROL = {"type": "ephemeral"}
+SYSTEM_BLOCKS = [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": CACHE_CONTROL}]
+
+# Starter buttons: (label, prompt once a deck is loaded, prompt without a deck)
+# STARTERS[0] is the deck review that batch runs send for every deck
+STARTERS = (
+    (
+        "📊 Review my pitch deck",
+        "Review my pitch deck from an investor's perspective. Be specific about what's working and what needs to change.",
+        "I'd like you to review my pitch deck. Let me upload it first."
+    ),
+    (
+        "🎯 Am I ready to raise?",
+        "Based on my deck, am I ready to fundraise? What proof points am I missing?",
+        "Help me figure out if I'm ready to raise. What questions should I be able to answer before approaching investors?"
+    ),
+    (
+        "🔍 Find investors for me",
+        "Based on my pitch deck, find investors who would be a good fit for my startup.",
+        "Help me find investors. I'll describe my startup so you can suggest who might be a good fit."
+    ),
+    (
+        "✉️ Review my outreach email",
+        "Help me write a cold email to an investor based on my deck. What should I include to get a response?",
+        "I want to write a cold email to an investor. What makes the difference between one that gets ignored vs one that gets a response?"
+    ),
+)
+
+# Keywords are matched as whole words, case-insensitively; those longer than three
+# characters also match their plural ("pilots", "which angels"). Other inflections
+# are listed explicitly ("matching investors")
+INTENT_KEYWORDS = {
+    "investor_search": (
+        'find investor', 'suggest investor', 'recommend investor', 'who should i pitch',
+        'match', 'matches', 'matched', 'matching', 'which vc', 'which angel'
+    ),
+    "deck_review": ('review my pitch deck', 'review my deck', 'analyze my deck', 'feedback on my deck'),
+}
+
+# Checked in order; the first stage with a keyword in the text wins
+STAGE_KEYWORDS = (
+    ("pre-seed", ('pre-seed', 'preseed', 'idea stage', 'prototype')),
+    ("seed", ('seed', 'early revenue', 'mvp', 'pilot', 'first customer')),
+    ("series a", ('series a', 'scaling', 'growth stage')),
+)
+SECTORS = (
+    'ai', 'fintech', 'healthtech', 'health', 'saas', 'b2b', 'b2c', 'consumer', 'enterprise',
+    'climate', 'sustainability', 'edtech', 'proptech', 'foodtech', 'biotech', 'deeptech',
+    'marketplace', 'ecommerce', 'gaming', 'web3', 'blockchain', 'crypto', 'mental health',
+    'wellness', 'fashion', 'retail', 'logistics', 'hr', 'legal', 'insurance', 'cybersecurity',
+    'iot', 'robotics', 'energy', 'cleantech', 'agtech', 'space', 'mobility', 'impact',
+    'neurodiversity', 'diversity', 'inclusion', 'workplace', 'employee', 'future of work'
+)
+
+ALL_KEYWORDS = sorted(
+    {kw for keywords in INTENT_KEYWORDS.values() for kw in keywords}
+    | {kw for _, keywords in STAGE_KEYWORDS for kw in keywords}
+    | set(SECTORS),
+    key=len,
+    reverse=True
+)
+# One alternation, longest keyword first, so the text is scanned once for everything
+KEYWORD_PATTERN = re.compile(
+    r"\b(?:(" + "|".join(re.escape(kw) for kw in ALL_KEYWORDS if len(kw) > 3) + r")s?"
+    r"|(" + "|".join(re.escape(kw) for kw in ALL_KEYWORDS if len(kw) <= 3) + r"))\b",
+    re.IGNORECASE
+)
+# Keywords inside longer ones ("health" in "mental health"), which the longer match consumes
+IMPLIED_KEYWORDS = {
+    kw: frozenset(
+        other for other in ALL_KEYWORDS
+        if other != kw and re.search(r"\b" + re.escape(other) + (r"s?\b" if len(other) > 3 else r"\b"), kw)
+    )
+    for kw in ALL_KEYWORDS
+}
+
+# Decks whose keywords have already been detected, by content hash
+DECK_DETECTION_CACHE_SIZE = 256
+
+MAX_SEARCH_SECTORS = 5
+MAX_MATCHES = 10
+# Most investor snippet tokens sent with one message; the best matches are kept
+INVESTOR_TOKEN_BUDGET = int(os.environ.get("INVESTOR_TOKEN_BUDGET", 2000))
+# Geography used to rank investors when the founder doesn't name one
+DEFAULT_GEOGRAPHY = "UK"
+# Recent messages whose user turns are searched for a description of the startup
+SEARCH_HISTORY_MESSAGES = 6
+
+RAISE_PATTERN = re.compile(
+    r"\b(?:rais(?:e|ing)|round of|seeking|looking for)\b[^.\n$£€\d]{0,30}"
+    r"([$£€]?\s?\d[\d,.]*\s?(?:k|m|mn|million|thousand)?\b(?:\s?(?:usd|gbp|eur))?)"
+    r"|([$£€]\s?\d[\d,.]*\s?(?:k|m|mn|million|thousand)?)\s+(?:raise|round|seed|pre-seed)",
+    re.IGNORECASE
+)
+EXPLICIT_AMOUNT_PATTERN = re.compile(r"[$£€]|\d\s?(?:k|m|mn|million|thousand)\b|usd|gbp|eur", re.IGNORECASE)
+# Amounts counting people or things rather than money ("looking for 10k beta users")
+COUNTED_NOUN_PATTERN = re.compile(
+    r"\s*(?:[a-z-]+\s+)?(?:users|customers|clients|downloads|installs|sign-?ups|subscribers|members|"
+    r"followers|visitors|views|people|parents|students|patients|teachers|businesses|companies|units|orders)\b",
+    re.IGNORECASE
+)
+
+DECK_REFERENCE_CONTEXT = """
+
+---
+Reference the pitch deck above in your response where relevant.
+"""
+
+DECK_INVESTOR_SEARCH_CONTEXT = """
+
+---
+Use the pitch deck above to understand the business and find matching investors.
+"""
+
+NO_DECK_INVESTOR_SEARCH_CONTEXT = """
+
+The user wants help finding investors but hasn't uploaded a deck or described their startup yet. 
+Ask them to briefly describe: 1) What their startup does, 2) What stage they're at, 3) What sector/industry they're in.
+Once they provide this, you can search the investor database for matches.
+"""
+
+DECK_REVIEW_CONTEXT = """
+
+---
+Analyze THIS SPECIFIC DECK. Reference their actual slides and content. Do not give generic advice.
+"""
+
+NO_DECK_REVIEW_CONTEXT = """
+
+The user wants a deck review but hasn't uploaded one yet. Let them know they can upload a PDF or PowerPoint deck using the file uploader, and you'll give specific feedback on it.
+"""
+
+MISSING_STARTUP_CONTEXT = """
+
+The user wants investor recommendations but you don't have enough context about their startup yet. 
+Ask them to describe: 1) What their startup does, 2) What stage they're at (pre-seed, seed, Series A), 3) What sector/industry.
+"""
+
+DECK_MATCHES_CONTEXT = """
+
+---
+**MATCHING INVESTORS FROM DATABASE**:
+
+{investors}
+
+Based on the deck and these investor matches, recommend 5-10 investors that fit best. Explain why each is a good fit based on their thesis and the startup's focus. Remind them to research each one and look for warm intro paths.
+---
+"""
+
+CHAT_MATCHES_CONTEXT = """
+
+---
+**MATCHING INVESTORS FROM DATABASE**:
+
+{investors}
+
+Recommend 5-10 that fit best based on the startup described. Explain why each is a good fit. Remind them to research and find warm intros.
+---
+"""
+
+
+def detect_raise_amount(text):
+    """The round size mentioned in text, in US dollars (amounts without a currency are read as GBP)"""
+    for match in RAISE_PATTERN.finditer(text):
+        amount_text = match.group(1) or match.group(2)
+        # Bare numbers after "raising" are usually years or counts, not round sizes
+        if not EXPLICIT_AMOUNT_PATTERN.search(amount_text):
+            continue
+        if match.group(1) and COUNTED_NOUN_PATTERN.match(text, match.end(1)):
+            continue
+        return parse_amount(amount_text, default_currency="GBP")
+    return None
+
+
+class Detection:
+    """Intents, funding stage, sectors and raise amount detected in some text"""
+
+    def __init__(self, keywords=frozenset(), raise_amount=None):
+        self.keywords = keywords
+        self.raise_amount = raise_amount
+        self.intents = {intent for intent, kws in INTENT_KEYWORDS.items() if not keywords.isdisjoint(kws)}
+        # The earliest stage mentioned anywhere wins
+        self.stage = next((stage for stage, kws in STAGE_KEYWORDS if not keywords.isdisjoint(kws)), None)
+        self.sectors = [sector for sector in SECTORS if sector in keywords]
+
+    def __or__(self, other):
+        """Everything detected in either text; the raise amount comes from the first that has one"""
+        raise_amount = self.raise_amount if self.raise_amount is not None else other.raise_amount
+        return Detection(self.keywords | other.keywords, raise_amount)
+
+
+def detect(text, raise_amount=True):
+    """Detect everything in a single pass over text (and one more for the raise amount)"""
+    keywords = set()
+    for match in KEYWORD_PATTERN.finditer(text):
+        kw = (match.group(1) or match.group(2)).lower()
+        keywords.add(kw)
+        keywords |= IMPLIED_KEYWORDS[kw]
+    return Detection(frozenset(keywords), detect_raise_amount(text) if raise_amount else None)
+
+
+_deck_detections = OrderedDict()
+_deck_detections_lock = threading.Lock()
+
+
+def detect_deck(deck_content):
+    """detect() for a deck, cached by content hash so a deck is only scanned once"""
+    digest = hashlib.sha256(deck_content.encode("utf-8")).hexdigest()
+    with _deck_detections_lock:
+        detection = _deck_detections.get(digest)
+        if detection is not None:
+            _deck_detections.move_to_end(digest)
+            return detection
+    detection = detect(deck_content)
+    with _deck_detections_lock:
+        _deck_detections[digest] = detection
+        while len(_deck_detections) > DECK_DETECTION_CACHE_SIZE:
+            _deck_detections.popitem(last=False)
+    return detection
+
+
+def find_matching_investors(index, stage=None, sector_keywords=None, geography=None, investor_type=None,
+                            max_results=20, raise_amount=None, strict_geography=False, strict_raise=True):
+    """Filter investors based on criteria"""
+    with span("investor_search"):
+        return index.search(
+            stage=stage,
+            sector_keywords=sector_keywords,
+            geography=geography,
+            investor_type=investor_type,
+            max_results=max_results,
+            raise_amount=raise_amount,
+            strict_geography=strict_geography,
+            strict_raise=strict_raise
+        )
+
+
+INVESTOR_SEPARATOR = "\n\n"
+INVESTOR_SEPARATOR_TOKENS = estimate_tokens(INVESTOR_SEPARATOR)
+
+
+def format_investor_for_context(investors, token_budget=INVESTOR_TOKEN_BUDGET):
+    """Format investor list for inclusion in AI context
+
+    Joins each investor's prepared snippet, in ranked order, while they fit in
+    token_budget. The best match is always included.
+    """
+    if not investors:
+        return "No matching investors found in the database."
+
+    snippets = [investors[0].snippet]
+    used = investors[0].snippet_tokens
+    for inv in investors[1:]:
+        used += INVESTOR_SEPARATOR_TOKENS + inv.snippet_tokens
+        if used > token_budget:
+            break
+        snippets.append(inv.snippet)
+    return INVESTOR_SEPARATOR.join(snippets)
+
+
+def format_deck_block(deck_text, deck_filename, shown_pages=None, total_pages=None):
+    """Format the deck as the single canonical block sent at the start of the conversation"""
+    source = deck_filename
+    if shown_pages is not None and shown_pages < total_pages:
+        source += f"; the {shown_pages} of {total_pages} slides most relevant to this conversation"
+    return f"""---
+**PITCH DECK CONTENT** (from {source}):
+
+{deck_text}
+
+---"""
+
+
+def attach_deck(messages, deck, selected, deck_filename):
+    """Put the block of selected deck slides, as a cache breakpoint, in front of the first message"""
+    deck_block = format_deck_block(
+        deck.render(selected, DECK_TOKEN_BUDGET),
+        deck_filename,
+        len(selected) if len(deck) else None,
+        len(deck)
+    )
+    messages[0] = {
+        "role": "user",
+        "content": [
+            {"type": "text", "text": deck_block, "cache_control": CACHE_CONTROL},
+            {"type": "text", "text": messages[0]["content"]},
+        ]
+    }
+    return messages
+
+
+def match_deck_investors(deck_content, index):
+    """The deck's Detection and the investors matching it, ranked for the default geography
+
+    An amount read from a deck may not be the round size, so it only ranks investors.
+    """
+    deck = detect_deck(deck_content)
+    matches = find_matching_investors(
+        index,
+        # Most decks are at seed when they don't say otherwise
+        stage=deck.stage or "seed",
+        sector_keywords=deck.sectors[:MAX_SEARCH_SECTORS] or None,
+        geography=DEFAULT_GEOGRAPHY,
+        max_results=MAX_MATCHES,
+        raise_amount=deck.raise_amount,
+        strict_raise=False
+    )
+    return deck, matches
+
+
+def starter_context(prompt, deck_content, index):
+    """Instructions appended to a starter prompt, with investor matches for investor searches"""
+    intents = detect(prompt, raise_amount=False).intents
+
+    # Investor search with a deck: search the database using the deck
+    if "investor_search" in intents and deck_content:
+        _, matches = match_deck_investors(deck_content, index)
+        context = DECK_INVESTOR_SEARCH_CONTEXT
+        if matches:
+            context += DECK_MATCHES_CONTEXT.format(investors=format_investor_for_context(matches))
+        return context
+    if "investor_search" in intents:
+        return NO_DECK_INVESTOR_SEARCH_CONTEXT
+    if "deck_review" in intents:
+        return DECK_REVIEW_CONTEXT if deck_content else NO_DECK_REVIEW_CONTEXT
+    return DECK_REFERENCE_CONTEXT if deck_content else ""
+
+
+def chat_context(prompt, deck_content, recent_messages, index):
+    """Instructions appended to a chat message, with investor matches for investor searches
+
+    The startup is described by the prompt, the deck and the user's recent_messages.
+    """
+    context = DECK_REFERENCE_CONTEXT if deck_content else ""
+    detection = detect(prompt)
+    if "investor_search" not in detection.intents:
+        return context
+
+    for msg in recent_messages:
+        if msg["role"] == "user":
+            detection |= detect(msg["content"])
+    # Only a round size the founder states filters investors; one read from the deck ranks them
+    stated_raise = detection.raise_amount
+    if deck_content:
+        detection |= detect_deck(deck_content)
+
+    # Only search with enough context, otherwise ask the founder for details
+    if not (detection.stage or detection.sectors):
+        return context + MISSING_STARTUP_CONTEXT
+
+    # A geography named as a location ("investors in Germany") filters investors; other
+    # mentions and the default only rank them
+    geography, located = detect_geography(prompt)
+    matches = find_matching_investors(
+        index,
+        stage=detection.stage,
+        sector_keywords=detection.sectors[:MAX_SEARCH_SECTORS] or None,
+        geography=geography or DEFAULT_GEOGRAPHY,
+        max_results=MAX_MATCHES,
+        raise_amount=detection.raise_amount,
+        strict_geography=located,
+        strict_raise=stated_raise is not None
+    )
+    if matches:
+        context += CHAT_MATCHES_CONTEXT.format(investors=format_investor_for_context(matches))
+    return context
+
+
+def deck_review_request(deck_content, deck_filename, index):
+    """messages.create arguments for the "Review my pitch deck" starter, built as the app builds it"""
+    prompt = STARTERS[0][1]
+    deck = DeckPages(deck_content, split_deck_pages(deck_content))
+    selected = deck.select(prompt, (), DECK_TOKEN_BUDGET, fill=True)
+    messages = [{"role": "user", "content": prompt + starter_context(prompt, deck_content, index)}]
+    return {
+        "model": MODEL,
+        "max_tokens": MAX_TOKENS,
+        "system": SYSTEM_BLOCKS,
+        "messages": attach_deck(messages, deck, selected, deck_filename),
+    }
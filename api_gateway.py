@@ -0,0 +1,155 @@
+"""Gateway around the Anthropic client: timeouts, retries and a process-wide concurrency limit.
+
+One ApiGateway is shared by every session in the process, so all requests go
+through the same pooled HTTP connections and the same fair queue. Rate-limit
+(429) and overloaded (529) responses, and connection failures, are retried with
+jittered exponential backoff. Point ANTHROPIC_BASE_URL at a local mock server
+(tests/mock_api.py) to exercise all of this without the real API.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+
+import anthropic
+
+from metrics import span
+
+logger = logging.getLogger(__name__)
+
+API_BASE_URL = os.environ.get("ANTHROPIC_BASE_URL") or None
+# Seconds to connect, and to wait for each chunk of a (streamed) response
+API_CONNECT_TIMEOUT = float(os.environ.get("API_CONNECT_TIMEOUT", 5))
+API_READ_TIMEOUT = float(os.environ.get("API_READ_TIMEOUT", 60))
+
+# Requests in flight at once across every session in the process; the rest queue in order
+API_MAX_CONCURRENCY = int(os.environ.get("API_MAX_CONCURRENCY", 8))
+# Longest a request waits in the queue before giving up
+API_QUEUE_TIMEOUT = float(os.environ.get("API_QUEUE_TIMEOUT", 120))
+
+API_MAX_RETRIES = int(os.environ.get("API_MAX_RETRIES", 4))
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRY_STATUS_CODES = (429, 503, 529)
+
+
+class GatewayBusyError(Exception):
+    """Raised when a request waited longer than its queue timeout for a slot"""
+
+
+class FairSemaphore:
+    """Counting semaphore that hands out slots in arrival order
+
+    threading.Semaphore wakes an arbitrary waiter, so under load a request can
+    starve while later ones get through. Here waiters queue up and only the one
+    at the head of the queue may take a free slot.
+    """
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.condition = threading.Condition()
+        self.waiters = deque()
+
+    def acquire(self, timeout=None):
+        ticket = object()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            self.waiters.append(ticket)
+            try:
+                while self.waiters[0] is not ticket or self.slots == 0:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self.condition.wait(remaining)
+                self.slots -= 1
+                return True
+            finally:
+                self.waiters.remove(ticket)
+                # The next waiter may now be at the head with a slot free
+                self.condition.notify_all()
+
+    def release(self):
+        with self.condition:
+            self.slots += 1
+            self.condition.notify_all()
+
+    def queued(self):
+        with self.condition:
+            return len(self.waiters)
+
+
+def is_retryable(error):
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    return isinstance(error, anthropic.APIStatusError) and error.status_code in RETRY_STATUS_CODES
+
+
+def retry_delay(attempt, error=None):
+    """Full-jitter exponential backoff, never shorter than the server's retry-after"""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            delay = max(delay, min(RETRY_MAX_DELAY, float(response.headers.get("retry-after", 0))))
+        except ValueError:
+            pass
+    return delay
+
+
+class ApiGateway:
+    """Process-wide entry point for Messages API calls"""
+
+    def __init__(self, api_key, base_url=API_BASE_URL, max_concurrency=API_MAX_CONCURRENCY,
+                 max_retries=API_MAX_RETRIES, queue_timeout=API_QUEUE_TIMEOUT):
+        # One client means one pooled HTTP transport; retries are handled here instead
+        self.client = anthropic.Anthropic(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=anthropic.Timeout(API_READ_TIMEOUT, connect=API_CONNECT_TIMEOUT),
+            max_retries=0
+        )
+        self.semaphore = FairSemaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.queue_timeout = queue_timeout
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the process's concurrent request slots"""
+        with span("api_queue_wait"):
+            if not self.semaphore.acquire(self.queue_timeout):
+                raise GatewayBusyError(f"no API slot free after {self.queue_timeout:.0f}s")
+        try:
+            yield
+        finally:
+            self.semaphore.release()
+
+    def with_retries(self, call):
+        """Run call(), retrying retryable API errors with backoff"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return call()
+            except anthropic.APIError as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                delay = retry_delay(attempt, e)
+                logger.warning("Claude API call failed (%s), retrying in %.1fs", e, delay)
+                time.sleep(delay)
+
+    def create(self, **kwargs):
+        """messages.create with a queue slot and retries"""
+        with self.slot():
+            return self.with_retries(lambda: self.client.messages.create(**kwargs))
+
+    @contextmanager
+    def stream(self, **kwargs):
+        """messages.stream with a queue slot held until the stream is closed
+
+        Only opening the stream is retried: once text has been shown to the founder,
+        a failure is raised to the caller rather than restarting the reply.
+        """
+        with self.slot(), ExitStack() as stack:
+            yield self.with_retries(lambda: stack.enter_context(self.client.messages.stream(**kwargs)))
@@ -0,0 +1,263 @@
+"""Headless batch runs: investor shortlists and first-pass reviews for a directory of decks.
+
+    python batch_review.py decks/ results.jsonl             # extract decks and match investors
+    python batch_review.py decks/ results.jsonl --review    # also review every deck with Claude
+    python batch_review.py decks/ results.jsonl --batch-api # review through the Message Batches API
+
+Decks are extracted across a process pool, one worker per core by default, with the
+same extraction and on-disk cache as the app. Stage, sectors and raise are then
+detected and investors matched locally. With --review every deck is sent the
+"Review my pitch deck" starter, with at most --api-concurrency requests in flight
+and at most --requests-per-minute started per minute. With --batch-api the reviews
+are instead submitted together as one message batch, which is slower to come back
+but much cheaper per review, and the run waits for it to end.
+
+One JSON line is appended per deck as soon as it is finished, so an interrupted run
+can simply be started again: decks that already have a complete result in the output
+file are skipped, and failed ones are retried. Files with identical content are only
+processed once, but every path gets its own line.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from advisor import deck_review_request, match_deck_investors
+from api_gateway import API_MAX_CONCURRENCY, ApiGateway
+from deck_extraction import (
+    PDF_TYPE, PPTX_TYPE, DeckFile, extract_deck_content, file_digest, split_deck_pages, use_inline_ocr
+)
+from investor_db import load_investor_index
+from message_batches import BATCH_MAX_REQUESTS, BATCH_POLL_INTERVAL, BatchState, finish_batch, run_batch
+from metrics import record_usage
+
+logger = logging.getLogger(__name__)
+
+DECK_TYPES = {".pdf": PDF_TYPE, ".pptx": PPTX_TYPE}
+# Decks with less text than this are reported as failed, as in the app
+MIN_DECK_CHARS = 100
+INVESTOR_RESULT_FIELDS = ("name", "type", "stage", "countries", "cheque_min", "cheque_max", "website")
+
+DEFAULT_REQUESTS_PER_MINUTE = 50
+
+
+def find_decks(directory):
+    """Paths of the PDF and PPTX files under directory, in a stable order"""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in DECK_TYPES:
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+def read_deck(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    return DeckFile(data, os.path.basename(path), DECK_TYPES[os.path.splitext(path)[1].lower()])
+
+
+def extract_deck_file(path):
+    """Extract one deck in a worker process and return (text, method)"""
+    return extract_deck_content(read_deck(path))
+
+
+def completed_results(output_path, review):
+    """{digest: (a complete record, the paths it was written for)} for the results in output_path"""
+    done = {}
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by an interrupted run
+                continue
+            digest = record.get("digest")
+            if record.get("error") or (review and not record.get("review")):
+                done.pop(digest, None)
+            elif digest in done:
+                done[digest][1].add(record["path"])
+            else:
+                done[digest] = (record, {record["path"]})
+    return done
+
+
+class RateLimiter:
+    """Spaces out calls so at most requests_per_minute start per minute, across threads"""
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        time.sleep(start - now)
+
+
+class ResultWriter:
+    """Appends one JSON line per deck, flushed immediately so a crash loses nothing finished"""
+
+    def __init__(self, path):
+        self.file = open(path, "a")
+        self.lock = threading.Lock()
+        self.written = 0
+
+    def write(self, record):
+        with self.lock:
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.file.flush()
+            self.written += 1
+
+    def close(self):
+        self.file.close()
+
+
+def deck_record(path, directory, digest, text, method, index):
+    """Result for an extracted deck: what was detected and the investors it matches"""
+    record = {"path": os.path.relpath(path, directory), "digest": digest, "method": method}
+    if not text or len(text.strip()) <= MIN_DECK_CHARS:
+        record["error"] = "Couldn't extract content"
+        return record
+    detection, matches = match_deck_investors(text, index)
+    record.update({
+        "pages": len(split_deck_pages(text)),
+        "stage": detection.stage,
+        "sectors": detection.sectors,
+        "raise_amount": detection.raise_amount,
+        "investors": [{field: investor.get(field) for field in INVESTOR_RESULT_FIELDS} for investor in matches],
+    })
+    return record
+
+
+def review_deck(gateway, limiter, request):
+    """First-pass review of one deck"""
+    limiter.wait()
+    response = gateway.create(**request)
+    record_usage(response.usage, request["model"])
+    return "".join(block.text for block in response.content if block.type == "text")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("directory", help="directory of PDF and PPTX decks, searched recursively")
+    parser.add_argument("output", help="JSONL file results are appended to")
+    parser.add_argument("--review", action="store_true", help="also review each deck with Claude")
+    parser.add_argument("--batch-api", action="store_true",
+                        help="review through one Message Batches submission (implies --review)")
+    parser.add_argument("--poll-interval", type=float, default=BATCH_POLL_INTERVAL,
+                        help="seconds between checks on a submitted batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="extraction processes")
+    parser.add_argument("--api-concurrency", type=int, default=API_MAX_CONCURRENCY,
+                        help="review requests in flight at once")
+    parser.add_argument("--requests-per-minute", type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help="most review requests started per minute (0 for no limit)")
+    parser.add_argument("--investors-json", default="investors.json")
+    parser.add_argument("--investors-db", default="investors.db")
+    args = parser.parse_args(argv)
+    args.review = args.review or args.batch_api
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    gateway = None
+    if args.review:
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            parser.error("--review needs ANTHROPIC_API_KEY to be set")
+        gateway = ApiGateway(api_key=api_key, max_concurrency=args.api_concurrency)
+    limiter = RateLimiter(args.requests_per_minute)
+    index = load_investor_index(args.investors_json, args.investors_db)
+    writer = ResultWriter(args.output)
+
+    paths_by_digest = {}
+    for path in find_decks(args.directory):
+        paths_by_digest.setdefault(file_digest(read_deck(path)), []).append(path)
+
+    # Paths each result is written for: every copy of the deck still missing a result
+    targets = dict(paths_by_digest)
+
+    def write_result(record):
+        for path in targets.get(record["digest"]) or [os.path.join(args.directory, record["path"])]:
+            writer.write({**record, "path": os.path.relpath(path, args.directory)})
+
+    # A batch submitted by an interrupted run is collected before anything new is sent
+    state = BatchState(f"{args.output}.batch")
+    in_flight = state.load() if args.batch_api else None
+    if in_flight:
+        logger.info("Resuming batch %s", in_flight[0])
+        finish_batch(gateway, state, *in_flight, write_result, args.poll_interval)
+
+    done = completed_results(args.output, args.review)
+    targets.clear()
+    skipped = 0
+    for digest, paths in paths_by_digest.items():
+        record, written = done.get(digest, (None, set()))
+        missing = [path for path in paths if os.path.relpath(path, args.directory) not in written]
+        skipped += len(paths) - len(missing)
+        if not missing:
+            continue
+        targets[digest] = missing
+        if record is not None:
+            # A new copy of a deck that already has a result reuses it
+            write_result(record)
+    pending = [(paths[0], digest) for digest, paths in targets.items() if digest not in done]
+    logger.info("%d decks to process, %d already done", len(pending), skipped)
+
+    batch_records = {}
+    batch_requests = {}
+
+    def finish_review(record, request):
+        try:
+            record["review"] = review_deck(gateway, limiter, request)
+        except Exception as e:
+            logger.warning("Review failed for %s: %s", record["path"], e)
+            record["error"] = f"Review failed: {e}"
+        write_result(record)
+
+    try:
+        # Each extraction process OCRs its own pages; together they already fill the cores
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=use_inline_ocr) as pool, \
+                ThreadPoolExecutor(max_workers=args.api_concurrency, thread_name_prefix="review") as reviews:
+            futures = {pool.submit(extract_deck_file, path): (path, digest) for path, digest in pending}
+            for future in as_completed(futures):
+                path, digest = futures[future]
+                try:
+                    text, method = future.result()
+                    record = deck_record(path, args.directory, digest, text, method, index)
+                except Exception as e:
+                    logger.warning("Extraction failed for %s: %s", path, e)
+                    record = {"path": os.path.relpath(path, args.directory), "digest": digest,
+                              "error": f"Error reading file: {e}"}
+                if gateway is None or record.get("error"):
+                    write_result(record)
+                elif not args.batch_api:
+                    reviews.submit(finish_review, record, deck_review_request(text, os.path.basename(path), index))
+                elif len(batch_requests) < BATCH_MAX_REQUESTS:
+                    # Digests are 64 hex characters, a valid custom_id
+                    batch_records[digest] = record
+                    batch_requests[digest] = deck_review_request(text, os.path.basename(path), index)
+                else:
+                    logger.info("Batch is full, leaving %s for the next run", record["path"])
+                logger.info("Extracted %s (%s)", record["path"], record.get("error") or record.get("stage"))
+        if batch_requests:
+            run_batch(gateway, state, batch_records, batch_requests, write_result, args.poll_interval)
+    finally:
+        writer.close()
+    logger.info("Wrote %d results to %s", writer.written, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Synthetic benchmark inputs, generated once into benchmarks/.cache.
+
+Decks are built from seeded pseudo-random pitch-deck prose, so every run (and
+every machine) times the same documents:
+
+    text.pdf     text-only PDF
+    image.pdf    image-only PDF (rendered pages, no text layer), for OCR
+    mixed.pdf    text and image pages interleaved
+    large.pptx   many slides with text boxes, tables, groups and speaker notes
+
+Scaled investor databases replicate investors.json 10x and 100x and are
+compiled with investor_db, like the production database.
+"""
+
+import io
+import json
+import os
+import random
+
+from PIL import Image, ImageDraw, ImageFont
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from pypdf import PdfReader, PdfWriter
+
+from investor_db import compile_investor_db, load_compiled_index
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+TEXT_PDF_PAGES = 40
+IMAGE_PDF_PAGES = 12
+MIXED_PDF_PAGES = 24
+PPTX_SLIDES = 300
+
+SLIDE_TOPICS = [
+    "Problem", "Solution", "Why now", "Market size", "Business model", "Traction",
+    "Competition", "Go to market", "Team", "Financials", "The ask", "Use of funds",
+]
+VOCABULARY = (
+    "founders customers revenue growth seed pre-seed round raise fintech saas b2b platform "
+    "pilot retention churn margin market payments marketplace subscription enterprise "
+    "onboarding unit economics cac ltv recurring pipeline partnership regulation data ai "
+    "climate health workflow automation london uk europe traction month quarter"
+).split()
+
+
+def deck_text(rng, topic, lines=12):
+    """A slide's worth of deterministic pitch-deck prose"""
+    body = [topic]
+    for _ in range(lines):
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(6, 12))]
+        body.append(" ".join(words).capitalize() + f" {rng.randint(2, 95)}%.")
+    return body
+
+
+def text_pdf_bytes(pages):
+    """Minimal PDF with one page of Helvetica text per entry in pages (each a list of lines)"""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))), len(pages)
+        ),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(pages):
+        shown = " ".join(f"({line}) Tj T*" for line in lines)
+        content = f"BT /F1 11 Tf 50 760 Td 14 TL {shown} ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def load_font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+def image_pdf_bytes(pages, dpi=100):
+    """PDF whose pages are rendered images of the given lines, with no text layer"""
+    font = load_font(22)
+    images = []
+    for lines in pages:
+        image = Image.new("RGB", (int(8.5 * dpi), int(11 * dpi)), "white")
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines):
+            draw.text((40, 40 + row * 32), line, fill="black", font=font)
+        images.append(image)
+    buffer = io.BytesIO()
+    images[0].save(buffer, "PDF", save_all=True, append_images=images[1:], resolution=dpi)
+    return buffer.getvalue()
+
+
+def interleave_pdfs(first, second):
+    """Alternate the pages of two PDFs, then append whatever is left of the longer one"""
+    readers = [PdfReader(io.BytesIO(first)), PdfReader(io.BytesIO(second))]
+    writer = PdfWriter()
+    for i in range(max(len(reader.pages) for reader in readers)):
+        for reader in readers:
+            if i < len(reader.pages):
+                writer.add_page(reader.pages[i])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def pptx_bytes(rng, slides):
+    """Large deck: title and body text, a table every 5th slide, a group every 7th, notes on all"""
+    prs = Presentation()
+    for i in range(slides):
+        topic = SLIDE_TOPICS[i % len(SLIDE_TOPICS)]
+        lines = deck_text(rng, topic, lines=6)
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"{topic} ({i + 1})"
+        slide.placeholders[1].text = "\n".join(lines[1:])
+        if i % 5 == 0:
+            table = slide.shapes.add_table(4, 3, Inches(1), Inches(5), Inches(6), Inches(1.5)).table
+            for row in range(4):
+                for column in range(3):
+                    table.cell(row, column).text = f"{rng.choice(VOCABULARY)} {rng.randint(1, 999)}k"
+        if i % 7 == 0:
+            group = slide.shapes.add_group_shape()
+            for j in range(3):
+                box = group.shapes.add_textbox(Inches(1 + 2 * j), Inches(6.5), Inches(2), Inches(0.5))
+                box.text_frame.text = f"{rng.choice(VOCABULARY)} {rng.randint(1, 99)}%"
+                box.text_frame.paragraphs[0].runs[0].font.size = Pt(12)
+        slide.notes_slide.notes_text_frame.text = " ".join(deck_text(rng, "Notes", lines=2))
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def build_decks():
+    """Generate the deck fixtures that don't exist yet and return {name: path}"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    rng = random.Random(17)
+    text_pages = [deck_text(rng, SLIDE_TOPICS[i % len(SLIDE_TOPICS)]) for i in range(TEXT_PDF_PAGES)]
+    image_pages = [deck_text(rng, SLIDE_TOPICS[i % len(SLIDE_TOPICS)]) for i in range(IMAGE_PDF_PAGES)]
+
+    builders = {
+        "text.pdf": lambda: text_pdf_bytes(text_pages),
+        "image.pdf": lambda: image_pdf_bytes(image_pages),
+        "mixed.pdf": lambda: interleave_pdfs(
+            text_pdf_bytes(text_pages[:MIXED_PDF_PAGES // 2]),
+            image_pdf_bytes(image_pages[:MIXED_PDF_PAGES // 2])
+        ),
+        "large.pptx": lambda: pptx_bytes(random.Random(23), PPTX_SLIDES),
+    }
+    paths = {}
+    for name, build in builders.items():
+        path = paths[name] = os.path.join(CACHE_DIR, name)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(build())
+    return paths
+
+
+def scaled_investor_index(json_path, scale):
+    """InvestorIndex over investors.json replicated scale times, compiled and memory-mapped like production"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    scaled_json = json_path
+    if scale > 1:
+        scaled_json = os.path.join(CACHE_DIR, f"investors_{scale}x.json")
+        if not os.path.exists(scaled_json):
+            with open(json_path, "r") as f:
+                records = json.load(f)
+            scaled = [
+                {**record, "name": f"{record.get('name') or ''} #{copy}"}
+                for copy in range(scale) for record in records
+            ]
+            with open(scaled_json, "w") as f:
+                json.dump(scaled, f)
+
+    scaled_db = os.path.join(CACHE_DIR, f"investors_{scale}x.db")
+    index = load_compiled_index(scaled_db, scaled_json)
+    if index is None:
+        compile_investor_db(scaled_json, scaled_db)
+        index = load_compiled_index(scaled_db, scaled_json)
+    return index
@@ -0,0 +1,47 @@
+"""Offline stand-in for the Anthropic client, so benchmarks never touch the network"""
+
+import types
+
+import anthropic
+
+CANNED_REPLY = "Benchmark reply."
+
+
+def canned_message():
+    usage = types.SimpleNamespace(
+        input_tokens=0, output_tokens=0, cache_creation_input_tokens=0, cache_read_input_tokens=0
+    )
+    return types.SimpleNamespace(content=[types.SimpleNamespace(type="text", text=CANNED_REPLY)], usage=usage)
+
+
+class OfflineStream:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @property
+    def text_stream(self):
+        yield CANNED_REPLY
+
+    def get_final_message(self):
+        return canned_message()
+
+
+class OfflineMessages:
+    def create(self, **kwargs):
+        return canned_message()
+
+    def stream(self, **kwargs):
+        return OfflineStream()
+
+
+class OfflineAnthropic:
+    def __init__(self, *args, **kwargs):
+        self.messages = OfflineMessages()
+
+
+def install():
+    """Replace anthropic.Anthropic before the app creates its client"""
+    anthropic.Anthropic = OfflineAnthropic
@@ -0,0 +1,241 @@
+"""Benchmark suite for the extraction and investor-matching hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run                    # run everything, compare with the baseline if there is one
+    python -m benchmarks.run --save-baseline    # record this machine's baseline
+    python -m benchmarks.run --filter pptx --repeat 15
+
+Each target is calibrated to run for at least --min-time seconds per round, then
+timed for --repeat rounds. The median per call is compared with the baseline, and
+a target counts as a regression when it is more than --threshold slower and the
+difference is well outside the noise of either run (3x the larger median absolute
+deviation). The exit status is 1 if anything regressed.
+
+The Anthropic client is replaced with an offline stand-in and metrics export is
+disabled, so the suite needs neither network access nor an API key. OCR targets
+are skipped when pdf2image/pytesseract or the poppler/tesseract binaries are missing.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+DEFAULT_REPEAT = 7
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_THRESHOLD = 0.10
+NOISE_FACTOR = 3
+DEFAULT_SCALES = (1, 10, 100)
+
+# Representative searches, covering each filter the app uses
+SEARCH_QUERIES = [
+    {"stage": "seed", "sector_keywords": ["fintech", "b2b"], "geography": "UK"},
+    {"stage": "pre-seed", "sector_keywords": ["ai", "saas"], "geography": "UK", "raise_amount": 750_000},
+    {"stage": "series a", "sector_keywords": ["climate", "impact"], "geography": "Europe", "strict_geography": True},
+    {"stage": "seed", "sector_keywords": ["healthtech", "mental health"], "geography": "United States"},
+    {"stage": "seed", "sector_keywords": ["edtech"], "geography": "Nordics", "strict_geography": True,
+     "raise_amount": 2_000_000},
+    {"sector_keywords": ["proptech", "web3"], "geography": "Germany"},
+    {"stage": "pre-seed", "geography": "UK", "investor_type": "angel"},
+    {"stage": "series a", "sector_keywords": ["cybersecurity", "deeptech", "iot"], "geography": "UK"},
+]
+
+
+def load_engine():
+    """Import the extraction and advice modules headless, with metrics export off"""
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, REPO_ROOT)
+    os.environ["METRICS_DIR"] = ""
+
+    from benchmarks import offline
+    offline.install()
+    import advisor
+    import deck_extraction
+    return deck_extraction, advisor
+
+
+def ocr_available():
+    try:
+        import pdf2image  # noqa: F401
+        import pytesseract  # noqa: F401
+    except ImportError:
+        return False
+    return bool(shutil.which("pdftoppm") and shutil.which("tesseract"))
+
+
+def time_calls(func, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def measure(func, repeat, min_time, calls_per_run=1):
+    """Per-call timings: calibrate calls per round to reach min_time, then time repeat rounds"""
+    func()  # warm-up: imports, caches, worker processes
+    number = 1
+    while True:
+        elapsed = time_calls(func, number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+
+    rounds = [time_calls(func, number) / (number * calls_per_run) for _ in range(repeat)]
+    median = statistics.median(rounds)
+    quartiles = statistics.quantiles(rounds, n=4) if len(rounds) > 1 else [median] * 3
+    return {
+        "median": median,
+        "min": min(rounds),
+        "mean": statistics.fmean(rounds),
+        "iqr": quartiles[2] - quartiles[0],
+        "mad": statistics.median(abs(value - median) for value in rounds),
+        "rounds": repeat,
+        "calls_per_round": number * calls_per_run,
+    }
+
+
+def build_targets(deck_extraction, advisor, scales, include_ocr):
+    """{name: (func, calls_per_run)} for every benchmark target"""
+    from benchmarks.fixtures import build_decks, scaled_investor_index
+
+    decks = {}
+    for name, path in build_decks().items():
+        with open(path, "rb") as f:
+            decks[name] = f.read()
+
+    # A fresh file per call, so every run reads from the start
+    def deck(name, file_type):
+        return lambda: deck_extraction.DeckFile(decks[name], name, file_type)
+
+    targets = {}
+    for name in ("text.pdf", "mixed.pdf"):
+        open_deck = deck(name, deck_extraction.PDF_TYPE)
+        targets[f"extract_text_from_pdf_basic[{name}]"] = (
+            lambda open_deck=open_deck: deck_extraction.extract_text_from_pdf_basic(open_deck()), 1
+        )
+    if include_ocr:
+        for name in ("image.pdf", "mixed.pdf"):
+            open_deck = deck(name, deck_extraction.PDF_TYPE)
+            targets[f"extract_text_from_pdf_ocr[{name}]"] = (
+                lambda open_deck=open_deck: deck_extraction.extract_text_from_pdf_ocr(open_deck()), 1
+            )
+    open_pptx = deck("large.pptx", deck_extraction.PPTX_TYPE)
+    targets["extract_text_from_pptx[large.pptx]"] = (lambda: deck_extraction.extract_text_from_pptx(open_pptx()), 1)
+
+    for scale in scales:
+        index = scaled_investor_index(os.path.join(REPO_ROOT, "investors.json"), scale)
+
+        def search_all(index=index):
+            for query in SEARCH_QUERIES:
+                advisor.find_matching_investors(index, max_results=10, **query)
+        targets[f"find_matching_investors[{scale}x]"] = (search_all, len(SEARCH_QUERIES))
+
+    index = scaled_investor_index(os.path.join(REPO_ROOT, "investors.json"), 1)
+    matches = advisor.find_matching_investors(index, max_results=10, **SEARCH_QUERIES[0])
+    targets[f"format_investor_for_context[{len(matches)}]"] = (
+        lambda: advisor.format_investor_for_context(matches), 1
+    )
+    return targets
+
+
+def compare(results, baseline, threshold):
+    """Names of the targets that regressed against baseline"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        slower = result["median"] - before["median"]
+        noise = NOISE_FACTOR * max(result["mad"], before["mad"])
+        if result["median"] > before["median"] * (1 + threshold) and slower > noise:
+            regressions.append(name)
+    return regressions
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def print_report(results, baseline, regressions):
+    width = max(len(name) for name in results)
+    print(f"{'target':<{width}}  {'median':>11}  {'min':>11}  {'mad':>11}  {'vs baseline':>11}")
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name) if baseline else None
+        change = f"{(result['median'] / before['median'] - 1) * 100:+10.1f}%" if before else f"{'-':>11}"
+        flag = "  REGRESSION" if name in regressions else ""
+        print(
+            f"{name:<{width}}  {format_seconds(result['median']):>11}  {format_seconds(result['min']):>11}  "
+            f"{format_seconds(result['mad']):>11}  {change}{flag}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--filter", default="", help="only run targets whose name contains this")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed rounds per target")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="minimum seconds per round")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)),
+                        help="investor database scales, comma separated")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown of the median that counts as a regression")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    deck_extraction, advisor = load_engine()
+    include_ocr = ocr_available()
+    if not include_ocr:
+        print("OCR not available (pdf2image/pytesseract, pdftoppm, tesseract); skipping OCR targets")
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+    targets = build_targets(deck_extraction, advisor, scales, include_ocr)
+
+    results = {}
+    for name, (func, calls_per_run) in targets.items():
+        if args.filter in name:
+            results[name] = measure(func, args.repeat, args.min_time, calls_per_run)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+    print_report(results, baseline, regressions)
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "ocr": include_ocr,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Token-budgeted context assembly for API requests.
+
+Decks arrive as '--- Page N ---' / '--- Slide N ---' delimited text. Rather than
+pasting a fixed-length prefix of it into every request, the slides are ranked by
+relevance to the current prompt and whole slides are packed into a token budget.
+Slides already sent earlier in the conversation are kept where the budget allows,
+so the deck block (which sits in the cached prompt prefix) only changes when a
+question needs different slides.
+
+Long conversations are compacted the same way: the last few turns are sent
+verbatim and older turns are folded, in the background, into a rolling summary
+written by a cheaper model.
+"""
+
+import logging
+import os
+
+from metrics import record_usage, span
+from retrieval import RetrievalEngine, tokenize
+
+# Rough ratio for English prose with Claude's tokenizer; only used for budgeting
+CHARS_PER_TOKEN = 4
+
+# Most deck tokens sent in one request (about the size of the old 15,000-character slice)
+DECK_TOKEN_BUDGET = int(os.environ.get("DECK_TOKEN_BUDGET", 4000))
+# A slide too long for the budget left is still sent, cut short, if at least this much is left
+MIN_PARTIAL_SLIDE_TOKENS = 200
+
+# Turns (a user message and its reply) always sent verbatim
+HISTORY_KEEP_TURNS = int(os.environ.get("HISTORY_KEEP_TURNS", 4))
+# Older turns are folded into the summary in batches, so the history prefix (and the
+# prompt cache) only changes once every HISTORY_KEEP_TURNS turns
+HISTORY_FOLD_AFTER_TURNS = 2 * HISTORY_KEEP_TURNS
+# Hard cap on verbatim turns while a summary is still being written, or after one failed
+HISTORY_MAX_TURNS = 3 * HISTORY_KEEP_TURNS
+
+SUMMARY_MODEL = os.environ.get("SUMMARY_MODEL", "claude-3-5-haiku-20241022")
+SUMMARY_MAX_TOKENS = 800
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a founder and a fundraising advisor.
+
+Keep what matters for the rest of the conversation: what the startup does, its stage, sector, \
+traction and raise, the advice already given, the investors already recommended, and any open \
+questions. Use at most 300 words of plain bullet points, with no preamble.
+
+CURRENT SUMMARY:
+{summary}
+
+NEW TURNS:
+{transcript}"""
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def format_page(page):
+    return f"--- {page['label']} ---\n{page['text']}"
+
+
+class DeckPages:
+    """A deck's slides plus a retrieval index for ranking them against a prompt"""
+
+    def __init__(self, text, pages):
+        self.text = text
+        self.pages = pages
+        self.tokens = [estimate_tokens(format_page(page)) for page in pages]
+        documents = [f"{page['label']} {page['text']}" for page in pages]
+        self.retrieval = RetrievalEngine.build(documents, documents) if pages else None
+
+    def __len__(self):
+        return len(self.pages)
+
+    def relevance(self, query):
+        """Relevance of every slide to query, in [0, 1]"""
+        if self.retrieval is None:
+            return []
+        return self.retrieval.relevance(tokenize(query))
+
+    def select(self, query, sent=(), budget=DECK_TOKEN_BUDGET, fill=False):
+        """Indices of the slides to send for query, in the order they were chosen
+
+        Slides relevant to query come first, best first, then slides sent earlier in the
+        conversation (sent). With fill, or when neither gives anything, the remaining
+        slides follow in deck order. Slides are added while they fit the budget; empty
+        slides and slides repeating an earlier slide's text are skipped. The first slide
+        that was too long then fills what is left of the budget, cut short by render, so
+        a deck with text never gets an empty selection.
+        """
+        relevance = self.relevance(query)
+        relevant = sorted((i for i in range(len(self.pages)) if relevance[i] > 0), key=lambda i: -relevance[i])
+        order = relevant + [i for i in sent if i < len(self.pages)]
+        if fill or not order:
+            order += range(len(self.pages))
+
+        selected = []
+        seen_texts = set()
+        too_long = None
+        used = 0
+        for i in order:
+            text = self.pages[i]["text"]
+            if i in selected or not text or text in seen_texts:
+                continue
+            if used + self.tokens[i] > budget:
+                if too_long is None:
+                    too_long = i
+                continue
+            selected.append(i)
+            seen_texts.add(text)
+            used += self.tokens[i]
+        if too_long is not None and (not selected or budget - used >= MIN_PARTIAL_SLIDE_TOKENS):
+            selected.append(too_long)
+        return selected
+
+    def render(self, selected, budget=DECK_TOKEN_BUDGET):
+        """Deck text for the selected slides, in deck order
+
+        Slides are given their share of the budget in the order they were selected, so a
+        slide that no longer fits (the last one chosen by select) is cut to what is left.
+        A deck without slide markers can't be split, so it is cut to the budget instead.
+        """
+        if not self.pages:
+            return self.text[:budget * CHARS_PER_TOKEN]
+        rendered = {}
+        remaining = budget * CHARS_PER_TOKEN
+        for i in selected:
+            text = format_page(self.pages[i])
+            if len(text) > remaining:
+                text = text[:max(remaining - 3, 0)] + "..."
+            rendered[i] = text
+            remaining -= len(text) + 2
+        return "\n\n".join(rendered[i] for i in sorted(rendered))
+
+
+def summarize_history(client, summary, messages, model=SUMMARY_MODEL):
+    """Fold messages into the rolling summary with a single call to a cheaper model"""
+    speakers = {"user": "FOUNDER", "assistant": "ADVISOR"}
+    transcript = "\n\n".join(f"{speakers[m['role']]}: {m['content']}" for m in messages)
+    with span("summarize_history", model=model):
+        response = client.create(
+            model=model,
+            max_tokens=SUMMARY_MAX_TOKENS,
+            messages=[{
+                "role": "user",
+                "content": SUMMARY_PROMPT.format(summary=summary or "(none yet)", transcript=transcript)
+            }]
+        )
+    record_usage(response.usage, model)
+    return "".join(block.text for block in response.content if block.type == "text").strip()
+
+
+class ConversationHistory:
+    """Rolling summary of a conversation's older turns, and the background job updating it"""
+
+    def __init__(self):
+        self.summary = ""
+        # Number of leading messages the summary covers
+        self.summarized = 0
+        self.job = None
+        self.job_end = 0
+
+    def collect(self):
+        """Adopt the summary from a finished background job"""
+        if self.job is None or not self.job.done():
+            return
+        job, self.job = self.job, None
+        try:
+            self.summary = job.result()
+            self.summarized = self.job_end
+        except Exception as e:
+            logger.warning("Couldn't summarize conversation history: %s", e)
+
+    def compact(self, history, executor, client):
+        """API messages for history: the rolling summary followed by the recent turns verbatim
+
+        When more than HISTORY_FOLD_AFTER_TURNS turns are unsummarized, all but the last
+        HISTORY_KEEP_TURNS are submitted to executor to be folded into the summary. Until
+        that finishes at most HISTORY_MAX_TURNS turns are sent, so the payload stays bounded.
+        """
+        self.collect()
+        recent = history[self.summarized:]
+        if self.job is None and len(recent) > 2 * HISTORY_FOLD_AFTER_TURNS:
+            self.job_end = len(history) - 2 * HISTORY_KEEP_TURNS
+            self.job = executor.submit(summarize_history, client, self.summary, history[self.summarized:self.job_end])
+
+        recent = recent[-2 * HISTORY_MAX_TURNS:]
+        # The API needs the conversation to open with a user message
+        while recent and recent[0]["role"] != "user":
+            recent = recent[1:]
+        messages = [{"role": m["role"], "content": m["content"]} for m in recent]
+        if self.summary and messages:
+            messages[0]["content"] = f"""**SUMMARY OF THE EARLIER CONVERSATION**:
+
+{self.summary}
+
+---
+
+{messages[0]["content"]}"""
+        return messages
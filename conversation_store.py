@@ -0,0 +1,123 @@
+"""Persistent conversations, so a founder can reconnect to their session.
+
+Streamlit keeps a session's messages in memory tied to its websocket, so a
+network blip or a server restart used to lose the conversation. Here every
+finished turn is appended to a local SQLite database (WAL mode, so appends never
+block readers) under a session id that the app keeps in the page URL. Opening
+the URL again restores the messages and the session's deck.
+"""
+
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_STORE_PATH = os.environ.get("CONVERSATION_STORE_PATH", ".conversations.sqlite3")
+# Conversations untouched for this long are deleted
+CONVERSATION_TTL = float(os.environ.get("CONVERSATION_TTL", 30 * 24 * 60 * 60))
+CONVERSATION_PRUNE_INTERVAL = 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    deck_hash TEXT,
+    deck_filename TEXT,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL REFERENCES sessions(session_id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+"""
+
+
+class ConversationStore:
+    """Sessions' messages and deck handles in SQLite, appended turn by turn"""
+
+    def __init__(self, path=CONVERSATION_STORE_PATH, ttl=CONVERSATION_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One connection shared by the server's threads, serialized by self.lock
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+        self.last_pruned = 0.0
+        self.prune()
+
+    @staticmethod
+    def new_session_id():
+        return secrets.token_urlsafe(16)
+
+    def load(self, session_id):
+        """(messages, deck_hash, deck_filename) for a stored session, or None"""
+        with self.lock:
+            session = self.db.execute(
+                "SELECT deck_hash, deck_filename FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if session is None:
+                return None
+            rows = self.db.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows], session[0], session[1]
+
+    def append(self, session_id, messages):
+        """Append messages (a finished turn) to the session, in one transaction"""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self._touch(session_id)
+                next_seq = self.db.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE session_id = ?", (session_id,)
+                ).fetchone()[0]
+                self.db.executemany(
+                    "INSERT INTO messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                    [(session_id, next_seq + i, m["role"], m["content"]) for i, m in enumerate(messages)]
+                )
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+        self._prune_if_due()
+
+    def set_deck(self, session_id, deck_hash, deck_filename):
+        with self.lock:
+            self._touch(session_id)
+            self.db.execute(
+                "UPDATE sessions SET deck_hash = ?, deck_filename = ? WHERE session_id = ?",
+                (deck_hash, deck_filename, session_id)
+            )
+
+    def clear(self, session_id):
+        """Forget the session's messages and deck, for "Start over" """
+        with self.lock:
+            self.db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def prune(self):
+        """Delete conversations untouched for longer than ttl"""
+        with self.lock:
+            self.last_pruned = time.time()
+            cursor = self.db.execute("DELETE FROM sessions WHERE updated < ?", (self.last_pruned - self.ttl,))
+            if cursor.rowcount:
+                logger.info("Pruned %d expired conversations", cursor.rowcount)
+
+    def _prune_if_due(self):
+        if time.time() - self.last_pruned > CONVERSATION_PRUNE_INTERVAL:
+            self.prune()
+
+    def _touch(self, session_id):
+        self.db.execute(
+            "INSERT INTO sessions (session_id, updated) VALUES (?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET updated = excluded.updated",
+            (session_id, time.time())
+        )
@@ -0,0 +1,335 @@
+"""Deck text extraction: PDF text layers, OCR for image-only pages, and PPTX slides.
+
+Extractions are cached on disk by the SHA-256 of the file, tagged with the extractor
+version, so a deck is only processed once per server. IngestionJob runs an extraction
+off the caller's thread and reports page-level progress while it does.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pypdf import PdfReader
+
+from deck_ocr import InlineExecutor, init_ocr_worker, ocr_pages
+from metrics import observe_stage, span
+from pptx_text import iter_slides
+
+logger = logging.getLogger(__name__)
+
+PDF_TYPE = "application/pdf"
+PPTX_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+
+def extract_text_from_pdf_basic(file):
+    """Extract text from PDF using basic pypdf method"""
+    reader = PdfReader(file)
+    text = ""
+    for page_num, page in enumerate(reader.pages, 1):
+        with span("extract_page", method="text"):
+            page_text = page.extract_text() or ""
+        if page_text.strip():
+            text += f"\n--- Page {page_num} ---\n{page_text}"
+    return text
+
+
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+
+def get_ocr_pool():
+    """Process pool shared by everything in this process for OCR, sized to the available cores"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_ocr_worker
+            )
+        return _ocr_pool
+
+
+def discard_ocr_pool(pool):
+    """Replace a pool whose worker died (e.g. killed for memory on a huge page) on next use"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is pool:
+            _ocr_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def use_inline_ocr():
+    """OCR in the calling process from now on, for worker processes that already fill a core each"""
+    global _ocr_pool
+    init_ocr_worker()
+    with _ocr_pool_lock:
+        _ocr_pool = InlineExecutor()
+
+
+def ocr_pdf_pages(file, page_numbers=None, progress=None):
+    """OCR the given pages of a PDF (all pages by default) and return {page_num: text}"""
+    try:
+        import pdf2image
+        import pytesseract
+        
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
+            tmp_file.write(file.getvalue())
+            tmp_path = tmp_file.name
+        
+        try:
+            if page_numbers is None:
+                page_count = pdf2image.pdfinfo_from_path(tmp_path)["Pages"]
+                page_numbers = range(1, page_count + 1)
+            on_progress = (lambda done, total: progress("OCR", done, total)) if progress else None
+            # A broken pool fails every later task, so it is rebuilt and the pages retried once
+            for attempt in range(2):
+                pool = get_ocr_pool()
+                try:
+                    return ocr_pages(pool, tmp_path, page_numbers, on_progress=on_progress)
+                except BrokenProcessPool as e:
+                    logger.error("OCR worker died, restarting the OCR pool: %s", e)
+                    discard_ocr_pool(pool)
+                    if attempt:
+                        raise
+        finally:
+            os.unlink(tmp_path)
+            
+    except ImportError as e:
+        return None
+    except Exception as e:
+        logger.warning("OCR processing error: %s", e)
+        return None
+
+
+def extract_text_from_pdf_ocr(file):
+    """Extract text from PDF using OCR for image-heavy documents"""
+    page_texts = ocr_pdf_pages(file)
+    if page_texts is None:
+        return None
+    
+    text = ""
+    for i in sorted(page_texts):
+        page_text = page_texts[i]
+        if page_text.strip():
+            text += f"\n--- Page {i} (OCR) ---\n{page_text}"
+    return text
+
+
+# Pages with less extracted text than this are treated as images and OCR'd
+MIN_PAGE_TEXT_CHARS = 50
+
+
+def extract_text_from_pdf(file, progress=None):
+    """Extract text from PDF page by page, OCRing only the pages pypdf found no text on
+
+    Returns (text, method, complete); complete is False when pages needed OCR but it failed.
+    """
+    file.seek(0)
+    reader = PdfReader(file)
+    page_texts = []
+    for page_num, page in enumerate(reader.pages, 1):
+        with span("extract_page", method="text"):
+            page_texts.append(page.extract_text() or "")
+        if progress:
+            progress("Reading", page_num, len(reader.pages))
+    
+    sparse_pages = [
+        page_num for page_num, page_text in enumerate(page_texts, 1)
+        if len(page_text.strip()) < MIN_PAGE_TEXT_CHARS
+    ]
+    ocr_texts = {}
+    if sparse_pages:
+        file.seek(0)
+        ocr_texts = ocr_pdf_pages(file, sparse_pages, progress)
+    complete = ocr_texts is not None
+    ocr_texts = ocr_texts or {}
+    
+    text = ""
+    methods = set()
+    for page_num, page_text in enumerate(page_texts, 1):
+        ocr_text = ocr_texts.get(page_num, "")
+        if len(ocr_text.strip()) > len(page_text.strip()):
+            text += f"\n--- Page {page_num} (OCR) ---\n{ocr_text}"
+            methods.add("OCR")
+        elif page_text.strip():
+            text += f"\n--- Page {page_num} ---\n{page_text}"
+            methods.add("text")
+    
+    if methods == {"OCR"}:
+        return text, "OCR", complete
+    if methods == {"text", "OCR"}:
+        return text, "text+OCR", complete
+    return text, "text", complete
+
+
+def pptx_sections(file):
+    """Yield a '--- Slide N ---' section for each PPTX slide with any text, notes included"""
+    start = time.perf_counter()
+    for slide in iter_slides(file):
+        observe_stage("extract_page", time.perf_counter() - start, method="pptx")
+        slide_text = slide["text"]
+        if slide["notes"]:
+            slide_text += f"\nSpeaker notes: {slide['notes']}"
+        if slide_text.strip():
+            yield f"\n--- Slide {slide['number']} ---\n{slide_text}\n"
+        start = time.perf_counter()
+
+
+def extract_text_from_pptx(file):
+    """Extract text from PowerPoint file, slide by slide, including tables, groups, charts and notes"""
+    file.seek(0)
+    return "".join(pptx_sections(file))
+
+
+# Extraction cache, shared by all sessions on this server and kept across restarts
+DECK_CACHE_DIR = os.environ.get("DECK_CACHE_DIR", ".deck_cache")
+DECK_CACHE_MAX_BYTES = int(os.environ.get("DECK_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+# Bump whenever extraction output changes, so decks cached by an older extractor are extracted again
+EXTRACTOR_VERSION = 3
+
+PAGE_MARKER_PATTERN = re.compile(r"^--- ((?:Page|Slide) \d+.*?) ---$", re.MULTILINE)
+
+
+def file_digest(uploaded_file):
+    """SHA-256 of the uploaded file's bytes"""
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+
+def split_deck_pages(text):
+    """Split extracted deck text on its '--- Page N ---' / '--- Slide N ---' markers"""
+    parts = PAGE_MARKER_PATTERN.split(text or "")
+    return [
+        {"label": label, "text": page_text.strip()}
+        for label, page_text in zip(parts[1::2], parts[2::2])
+    ]
+
+
+def load_cached_extraction(digest):
+    """Return the cached extraction for a file digest, or None on a miss"""
+    path = os.path.join(DECK_CACHE_DIR, f"{digest}.json")
+    try:
+        with open(path, "r") as f:
+            entry = json.load(f)
+        if entry.get("version") != EXTRACTOR_VERSION:
+            return None
+        # Touch the entry so eviction drops the least recently used decks first
+        os.utime(path)
+        return entry
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_extraction(digest, text, method):
+    """Store an extraction in the cache and evict old entries beyond the size cap"""
+    entry = {"version": EXTRACTOR_VERSION, "text": text, "method": method, "pages": split_deck_pages(text)}
+    try:
+        os.makedirs(DECK_CACHE_DIR, exist_ok=True)
+        path = os.path.join(DECK_CACHE_DIR, f"{digest}.json")
+        with tempfile.NamedTemporaryFile("w", dir=DECK_CACHE_DIR, suffix=".tmp", delete=False) as tmp_file:
+            json.dump(entry, tmp_file)
+        os.replace(tmp_file.name, path)
+        evict_deck_cache()
+    except OSError as e:
+        logger.warning("Could not write deck cache entry: %s", e)
+
+
+def evict_deck_cache():
+    """Delete least recently used cache entries until the cache fits DECK_CACHE_MAX_BYTES"""
+    entries = []
+    for entry in os.scandir(DECK_CACHE_DIR):
+        if entry.name.endswith(".json"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= DECK_CACHE_MAX_BYTES:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def extract_deck_content(uploaded_file, progress=None):
+    """Extract text content from uploaded deck file"""
+    if uploaded_file is None:
+        return None, None
+    
+    digest = file_digest(uploaded_file)
+    with span("deck_cache_lookup"):
+        cached = load_cached_extraction(digest)
+    if cached:
+        return cached["text"], cached["method"]
+    
+    text, method, complete = None, None, True
+    with span("extract_deck"):
+        if uploaded_file.type == PDF_TYPE:
+            text, method, complete = extract_text_from_pdf(uploaded_file, progress)
+        elif uploaded_file.type == PPTX_TYPE:
+            text, method = extract_text_from_pptx(uploaded_file), "PPTX"
+    
+    # A deck whose OCR failed is extracted again next time rather than cached without its image pages
+    if text and complete:
+        save_cached_extraction(digest, text, method)
+    return text, method
+
+
+class DeckFile(io.BytesIO):
+    """In-memory copy of an uploaded deck that can outlive the script run that received it"""
+
+    def __init__(self, data, name, type):
+        super().__init__(data)
+        self.name = name
+        self.type = type
+
+
+class IngestionJob:
+    """Deck extraction running on the ingestion pool, polled by the session that submitted it"""
+
+    def __init__(self, uploaded_file):
+        self.file = DeckFile(uploaded_file.getvalue(), uploaded_file.name, uploaded_file.type)
+        self.filename = uploaded_file.name
+        self.digest = file_digest(uploaded_file)
+        self.stage = "Queued"
+        self.done_pages = 0
+        self.total_pages = 0
+        self.text = None
+        self.method = None
+        self.error = None
+        self.future = None
+
+    def report(self, stage, done_pages, total_pages):
+        self.stage = stage
+        self.done_pages = done_pages
+        self.total_pages = total_pages
+
+    def progress_text(self):
+        if self.total_pages:
+            return f"{self.stage} {self.done_pages}/{self.total_pages}"
+        return self.stage
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def run(self):
+        self.stage = "Extracting"
+        try:
+            self.text, self.method = extract_deck_content(self.file, progress=self.report)
+        except Exception as e:
+            logger.exception("Deck extraction failed for %s", self.filename)
+            self.error = f"Error reading file: {str(e)}"
+        finally:
+            # The bytes are only needed while extracting
+            self.file = None
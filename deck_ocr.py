@@ -0,0 +1,90 @@
+"""Parallel OCR for image-only deck pages.
+
+The functions here run inside worker processes, so this module must stay
+importable without Streamlit.
+"""
+
+import os
+import time
+from concurrent.futures import Executor, Future, as_completed
+
+from metrics import observe_stage
+
+OCR_DPI = 150
+
+# Pages rasterized per task. Each worker only holds this many page bitmaps at once.
+OCR_CHUNK_PAGES = int(os.environ.get("OCR_CHUNK_PAGES", 2))
+
+
+def init_ocr_worker():
+    """Keep Tesseract single-threaded so worker processes don't oversubscribe the cores"""
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+class InlineExecutor(Executor):
+    """Runs each call as it is submitted, for processes that must not start an OCR pool of their own"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def ocr_page_range(pdf_path, first_page, last_page, dpi=OCR_DPI):
+    """Rasterize and OCR a contiguous range of pages, returning (page_num, text, seconds) triples
+
+    seconds is the time spent on the page, including its share of rasterizing the range.
+    """
+    import pdf2image
+    import pytesseract
+
+    start = time.perf_counter()
+    images = pdf2image.convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page)
+    raster_seconds = (time.perf_counter() - start) / max(len(images), 1)
+    results = []
+    for page_num, image in enumerate(images, first_page):
+        start = time.perf_counter()
+        text = pytesseract.image_to_string(image)
+        results.append((page_num, text, raster_seconds + time.perf_counter() - start))
+        image.close()
+    return results
+
+
+def page_chunks(page_numbers, chunk_size=OCR_CHUNK_PAGES):
+    """Group page numbers into contiguous (first, last) ranges of at most chunk_size pages"""
+    chunks = []
+    for page_num in sorted(set(page_numbers)):
+        if chunks and page_num == chunks[-1][1] + 1 and page_num - chunks[-1][0] < chunk_size:
+            chunks[-1][1] = page_num
+        else:
+            chunks.append([page_num, page_num])
+    return [tuple(chunk) for chunk in chunks]
+
+
+def ocr_pages(executor, pdf_path, page_numbers, chunk_size=OCR_CHUNK_PAGES, on_progress=None):
+    """OCR the given pages of a PDF across executor and return {page_num: text}
+
+    on_progress, if given, is called as on_progress(done_pages, total_pages) after each chunk.
+    """
+    futures = [
+        executor.submit(ocr_page_range, pdf_path, first_page, last_page)
+        for first_page, last_page in page_chunks(page_numbers, chunk_size)
+    ]
+    total_pages = len(set(page_numbers))
+    page_texts = {}
+    try:
+        for future in as_completed(futures):
+            for page_num, text, seconds in future.result():
+                page_texts[page_num] = text
+                # Workers can't see this process's metrics, so their timings are recorded here
+                observe_stage("extract_page", seconds, method="ocr")
+            if on_progress:
+                on_progress(len(page_texts), total_pages)
+    except Exception:
+        for future in futures:
+            future.cancel()
+        raise
+    return page_texts
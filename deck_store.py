@@ -0,0 +1,118 @@
+"""Server-side store of deck texts shared by every session.
+
+Sessions used to keep the full extracted deck in st.session_state, so server
+memory grew with sessions x deck size. Now a session only holds a handle, the
+deck's content hash. The text itself lives once per process in this store:
+
+- SQLite on local disk (DECK_STORE_PATH) holds every deck, so decks survive a
+  server restart and a founder reconnecting after one can carry on
+- a small in-memory LRU (DECK_STORE_MEMORY_BYTES) keeps recently used decks hot
+- every read or reconnect marks a deck as used. Decks unused for DECK_STORE_TTL
+  are deleted, checked at most every DECK_STORE_PRUNE_INTERVAL as decks are used.
+  Sessions are often abandoned without saying so, so last use is the only signal.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DECK_STORE_PATH = os.environ.get("DECK_STORE_PATH", ".deck_store.sqlite3")
+DECK_STORE_MEMORY_BYTES = int(os.environ.get("DECK_STORE_MEMORY_BYTES", 64 * 1024 * 1024))
+# As long as a stored conversation, so a founder coming back to one still has their deck
+DECK_STORE_TTL = float(os.environ.get("DECK_STORE_TTL", 30 * 24 * 60 * 60))
+DECK_STORE_PRUNE_INTERVAL = 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decks (
+    handle TEXT PRIMARY KEY,
+    filename TEXT,
+    text TEXT NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+class DeckStore:
+    """Deck texts by content hash, in SQLite with a hot in-memory LRU, expiring once unused"""
+
+    def __init__(self, path=DECK_STORE_PATH, memory_bytes=DECK_STORE_MEMORY_BYTES, ttl=DECK_STORE_TTL):
+        self.memory_bytes = memory_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()
+        self.memory_size = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One connection shared by the server's threads, serialized by self.lock
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(SCHEMA)
+        self.last_pruned = 0.0
+        self.prune()
+
+    def put(self, handle, text, filename=None):
+        """Store text under handle (its content hash) if it isn't stored yet, and mark it used"""
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO decks (handle, filename, text, last_used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(handle) DO UPDATE SET last_used = excluded.last_used",
+                (handle, filename, text, time.time())
+            )
+            self._remember(handle, text)
+        self._prune_if_due()
+        return handle
+
+    def touch(self, handle):
+        """Mark a stored deck used, e.g. for a session restored after a restart
+
+        Returns False if the deck is no longer stored.
+        """
+        with self.lock:
+            cursor = self.db.execute("UPDATE decks SET last_used = ? WHERE handle = ?", (time.time(), handle))
+            return cursor.rowcount > 0
+
+    def get(self, handle):
+        """The deck text for handle, or None if it isn't stored"""
+        if handle is None:
+            return None
+        with self.lock:
+            text = self.memory.get(handle)
+            if text is None:
+                row = self.db.execute("SELECT text FROM decks WHERE handle = ?", (handle,)).fetchone()
+                if row is None:
+                    return None
+                text = row[0]
+            self._remember(handle, text)
+            self.db.execute("UPDATE decks SET last_used = ? WHERE handle = ?", (time.time(), handle))
+        self._prune_if_due()
+        return text
+
+    def prune(self):
+        """Delete decks unused for longer than ttl"""
+        with self.lock:
+            self.last_pruned = time.time()
+            cursor = self.db.execute("DELETE FROM decks WHERE last_used < ?", (self.last_pruned - self.ttl,))
+            if cursor.rowcount:
+                # Expired decks can't be hot; dropping the whole LRU is simpler than finding them
+                self.memory.clear()
+                self.memory_size = 0
+                logger.info("Pruned %d expired decks from the deck store", cursor.rowcount)
+
+    def _prune_if_due(self):
+        if time.time() - self.last_pruned > DECK_STORE_PRUNE_INTERVAL:
+            self.prune()
+
+    def _remember(self, handle, text):
+        if handle in self.memory:
+            self.memory.move_to_end(handle)
+            return
+        self.memory[handle] = text
+        self.memory_size += len(text)
+        while self.memory_size > self.memory_bytes and len(self.memory) > 1:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_size -= len(evicted)
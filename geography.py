@@ -0,0 +1,233 @@
+"""Canonical country and region taxonomy for investor geography matching.
+
+Country names match the spelling used in investors.json. Regions expand to
+the set of countries they cover.
+"""
+
+import re
+
+# Every country name used in investors.json
+COUNTRY_NAMES = frozenset({
+    "Afghanistan", "Albania", "Algeria", "Andorra", "Angola", "Antigua and Barbuda", "Argentina",
+    "Armenia", "Australia", "Austria", "Azerbaijan", "Bahamas", "Bahrain", "Bangladesh", "Barbados",
+    "Belarus", "Belgium", "Belize", "Benin", "Bhutan", "Bolivia", "Bosnia-H", "Botswana", "Brazil",
+    "Brunei", "Bulgaria", "Burkina Faso", "Burundi", "Cabo Verde", "Cambodia", "Cameroon", "Canada",
+    "Central African Republic", "Chad", "Chile", "China", "Colombia", "Comoros",
+    "Congo (Congo-Brazzaville)", "Costa Rica", "Croatia", "Cuba", "Cyprus", "Czech Republic",
+    "Côte d'Ivoire", "DRC Congo", "Denmark", "Djibouti", "Dominica", "Dominican Republic", "Ecuador",
+    "Egypt", "El Salvador", "Equatorial Guinea", "Eritrea", "Estonia", "Eswatini", "Ethiopia", "Fiji",
+    "Finland", "France", "Gabon", "Gambia", "Georgia", "Germany", "Ghana", "Greece", "Grenada",
+    "Guatemala", "Guinea", "Guinea-Bissau", "Guyana", "Haiti", "Holy See", "Honduras", "Hong Kong",
+    "Hungary", "Iceland", "India", "Indonesia", "Iran", "Iraq", "Ireland", "Israel", "Italy", "Jamaica",
+    "Japan", "Jordan", "Kazakhstan", "Kenya", "Kiribati", "Kuwait", "Kyrgyzstan", "Laos", "Latvia",
+    "Lebanon", "Lesotho", "Liberia", "Liechtenstein", "Lithuania", "Luxembourg", "Lybia", "Madagascar",
+    "Malawi", "Malaysia", "Maldives", "Mali", "Malta", "Marshall Islands", "Mauritania", "Mauritius",
+    "Mexico", "Micronesia", "Moldova", "Monaco", "Mongolia", "Montenegro", "Morocco", "Mozambique",
+    "Myanmar", "Namibia", "Nauru", "Nepal", "Netherlands", "New Zealand", "Nicaragua", "Niger",
+    "Nigeria", "North Korea", "North Macedonia", "Norway", "Oman", "Pakistan", "Palau", "Palestine",
+    "Panama", "Papua New Guinea", "Paraguay", "Peru", "Philippines", "Poland", "Portugal", "Qatar",
+    "Romania", "Russia", "Rwanda", "Saint Vincent and the Grenadines", "Samoa", "San Marino",
+    "Sant Kitts and Nevis", "Sant Lucia", "Sao Tome and Principe", "Saudi Arabia", "Senegal", "Serbia",
+    "Seychelles", "Sierra Leone", "Singapore", "Slovakia", "Slovenia", "Solomon Islands", "Somalia",
+    "South Africa", "South Korea", "South Sudan", "Spain", "Sri Lanka", "Sudan", "Suriname", "Sweden",
+    "Switzerland", "Syria", "Taiwan", "Tajikistan", "Tanzania", "Thailand", "Timor-Leste", "Togo",
+    "Tonga", "Trinidad and Tobago", "Tunisia", "Turkey", "Turkmenistan", "Tuvalu", "UAE", "UK", "USA",
+    "Uganda", "Ukraine", "Uruguay", "Uzbekistan", "Vanuatu", "Venezuela", "Vietnam", "Yemen", "Zambia",
+    "Zimbabwe",
+})
+
+# Alternative spellings and cities that should resolve to a country in investors.json
+COUNTRY_ALIASES = {
+    "united kingdom": "UK",
+    "great britain": "UK",
+    "britain": "UK",
+    "england": "UK",
+    "scotland": "UK",
+    "wales": "UK",
+    "northern ireland": "UK",
+    "london": "UK",
+    "manchester": "UK",
+    "edinburgh": "UK",
+    "united states": "USA",
+    "united states of america": "USA",
+    "america": "USA",
+    "silicon valley": "USA",
+    "new york": "USA",
+    "san francisco": "USA",
+    "deutschland": "Germany",
+    "berlin": "Germany",
+    "munich": "Germany",
+    "paris": "France",
+    "holland": "Netherlands",
+    "the netherlands": "Netherlands",
+    "amsterdam": "Netherlands",
+    "dublin": "Ireland",
+    "stockholm": "Sweden",
+    "madrid": "Spain",
+    "barcelona": "Spain",
+    "lisbon": "Portugal",
+    "tel aviv": "Israel",
+    "united arab emirates": "UAE",
+    "dubai": "UAE",
+    "czechia": "Czech Republic",
+    "korea": "South Korea",
+    "bosnia": "Bosnia-H",
+    "bosnia and herzegovina": "Bosnia-H",
+    "libya": "Lybia",
+    "ivory coast": "Côte d'Ivoire",
+    "swaziland": "Eswatini",
+    "saint kitts and nevis": "Sant Kitts and Nevis",
+    "saint lucia": "Sant Lucia",
+    "east timor": "Timor-Leste",
+}
+
+# Short codes are only recognised in upper case, so "us" and "uk" inside words or
+# as pronouns ("contact us") don't count as a geography
+COUNTRY_CODES = {
+    "US": "USA",
+    "USA": "USA",
+    "UK": "UK",
+    "GB": "UK",
+    "UAE": "UAE",
+}
+
+# Region codes that, like country codes, only count in upper case
+REGION_CODES = {"EU": "eu", "MENA": "mena", "APAC": "apac", "LATAM": "latam", "DACH": "dach"}
+
+EUROPE = frozenset({
+    "Albania", "Andorra", "Austria", "Belarus", "Belgium", "Bosnia-H", "Bulgaria", "Croatia",
+    "Cyprus", "Czech Republic", "Denmark", "Estonia", "Finland", "France", "Germany", "Greece",
+    "Holy See", "Hungary", "Iceland", "Ireland", "Italy", "Latvia", "Liechtenstein", "Lithuania",
+    "Luxembourg", "Malta", "Moldova", "Monaco", "Montenegro", "Netherlands", "North Macedonia",
+    "Norway", "Poland", "Portugal", "Romania", "San Marino", "Serbia", "Slovakia", "Slovenia",
+    "Spain", "Sweden", "Switzerland", "UK", "Ukraine",
+})
+
+REGIONS = {
+    "europe": EUROPE,
+    "european union": EUROPE - {
+        "Albania", "Andorra", "Belarus", "Bosnia-H", "Holy See", "Iceland", "Liechtenstein",
+        "Moldova", "Monaco", "Montenegro", "North Macedonia", "Norway", "San Marino", "Serbia",
+        "Switzerland", "UK", "Ukraine",
+    },
+    "nordics": frozenset({"Denmark", "Finland", "Iceland", "Norway", "Sweden"}),
+    "dach": frozenset({"Austria", "Germany", "Switzerland"}),
+    "benelux": frozenset({"Belgium", "Luxembourg", "Netherlands"}),
+    "north america": frozenset({"USA", "Canada", "Mexico"}),
+    "latin america": frozenset({
+        "Argentina", "Belize", "Bolivia", "Brazil", "Chile", "Colombia", "Costa Rica", "Cuba",
+        "Dominican Republic", "Ecuador", "El Salvador", "Guatemala", "Guyana", "Honduras", "Mexico",
+        "Nicaragua", "Panama", "Paraguay", "Peru", "Suriname", "Uruguay", "Venezuela",
+    }),
+    "middle east": frozenset({
+        "Bahrain", "Egypt", "Iran", "Iraq", "Israel", "Jordan", "Kuwait", "Lebanon", "Oman",
+        "Palestine", "Qatar", "Saudi Arabia", "Syria", "Turkey", "UAE", "Yemen",
+    }),
+    "africa": frozenset({
+        "Algeria", "Angola", "Benin", "Botswana", "Burkina Faso", "Burundi", "Cabo Verde",
+        "Cameroon", "Central African Republic", "Chad", "Comoros", "Congo (Congo-Brazzaville)",
+        "Côte d'Ivoire", "DRC Congo", "Djibouti", "Egypt", "Equatorial Guinea", "Eritrea",
+        "Eswatini", "Ethiopia", "Gabon", "Gambia", "Ghana", "Guinea", "Guinea-Bissau", "Kenya",
+        "Lesotho", "Liberia", "Lybia", "Madagascar", "Malawi", "Mali", "Mauritania", "Mauritius",
+        "Morocco", "Mozambique", "Namibia", "Niger", "Nigeria", "Rwanda", "Sao Tome and Principe",
+        "Senegal", "Seychelles", "Sierra Leone", "Somalia", "South Africa", "South Sudan", "Sudan",
+        "Tanzania", "Togo", "Tunisia", "Uganda", "Zambia", "Zimbabwe",
+    }),
+    "caribbean": frozenset({
+        "Antigua and Barbuda", "Bahamas", "Barbados", "Cuba", "Dominica", "Dominican Republic",
+        "Grenada", "Haiti", "Jamaica", "Saint Vincent and the Grenadines", "Sant Kitts and Nevis",
+        "Sant Lucia", "Trinidad and Tobago",
+    }),
+    "asia": frozenset({
+        "Afghanistan", "Bangladesh", "Bhutan", "Brunei", "Cambodia", "China", "Hong Kong", "India",
+        "Indonesia", "Japan", "Kazakhstan", "Kyrgyzstan", "Laos", "Malaysia", "Maldives", "Mongolia",
+        "Myanmar", "Nepal", "Pakistan", "Philippines", "Singapore", "South Korea", "Sri Lanka", "Taiwan",
+        "Tajikistan", "Thailand", "Timor-Leste", "Turkmenistan", "Uzbekistan", "Vietnam",
+    }),
+    "oceania": frozenset({
+        "Australia", "Fiji", "Kiribati", "Marshall Islands", "Micronesia", "Nauru", "New Zealand",
+        "Palau", "Papua New Guinea", "Samoa", "Solomon Islands", "Tonga", "Tuvalu", "Vanuatu",
+    }),
+}
+REGIONS["eu"] = REGIONS["european union"]
+REGIONS["latam"] = REGIONS["latin america"]
+REGIONS["mena"] = REGIONS["middle east"] | {"Algeria", "Lybia", "Morocco", "Tunisia"}
+REGIONS["apac"] = REGIONS["asia"] | REGIONS["oceania"]
+REGIONS["asia pacific"] = REGIONS["apac"]
+
+_CANONICAL_NAMES = {country.lower(): country for country in COUNTRY_NAMES}
+
+
+def canonical_country(name):
+    """The investors.json spelling of a country name, or None if it isn't a known country"""
+    name = name.strip().strip('"')
+    # Entries like 'Eswatini (fmr. "Swaziland")' carry a former name in brackets
+    name = name.split(" (fmr.")[0]
+    lower = name.lower()
+    return _CANONICAL_NAMES.get(lower) or COUNTRY_ALIASES.get(lower)
+
+
+def parse_countries(countries):
+    """Canonical country names listed in an investor's comma-separated countries field"""
+    parsed = set()
+    for name in countries.split(","):
+        country = canonical_country(name)
+        if country:
+            parsed.add(country)
+    return parsed
+
+
+def resolve_geography(geography):
+    """Countries covered by a geography name (a country, alias, code or region), or None if unknown"""
+    if geography in COUNTRY_CODES:
+        return frozenset({COUNTRY_CODES[geography]})
+    if geography in REGION_CODES:
+        return REGIONS[REGION_CODES[geography]]
+    lower = geography.strip().lower()
+    if lower in REGIONS:
+        return REGIONS[lower]
+    country = canonical_country(geography)
+    if country is None:
+        country = COUNTRY_CODES.get(geography.strip().upper())
+    return frozenset({country}) if country else None
+
+
+# Region codes ("eu", "dach") are left to the upper-case code alternation below
+_NAMES = sorted(
+    set(_CANONICAL_NAMES) | set(COUNTRY_ALIASES) | (set(REGIONS) - set(REGION_CODES.values())),
+    key=len,
+    reverse=True
+)
+GEOGRAPHY_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(name) for name in _NAMES) + r")\b"
+    r"|\b(" + "|".join(sorted(list(COUNTRY_CODES) + list(REGION_CODES), key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+
+# A mention is a location, rather than e.g. a name, when cued: "based in Georgia", "UK investors"
+LOCATION_CUE_BEFORE = re.compile(r"\b(?:in|from|across|into|throughout|within|outside|out of)\s+(?:the\s+)?$", re.IGNORECASE)
+LOCATION_CUE_AFTER = re.compile(r"(?:-|\s+)(?:based|investors?|vcs?|angels?|funds?)\b", re.IGNORECASE)
+# Countries that are also first names or everyday words; only counted when cued
+AMBIGUOUS_NAMES = frozenset({"chad", "chile", "georgia", "guinea", "india", "israel", "jordan", "kenya", "niger", "turkey"})
+
+
+def detect_geography(text):
+    """The first country or region mentioned in text, as (a name resolve_geography understands, cued)
+
+    cued says whether the mention reads as a location, so it can filter investors rather
+    than only rank them. Returns (None, False) when there is no mention.
+    """
+    for match in GEOGRAPHY_PATTERN.finditer(text):
+        name = match.group(1)
+        # Codes are matched case-insensitively by the pattern but only accepted in upper case
+        if name is None and (match.group(2) in COUNTRY_CODES or match.group(2) in REGION_CODES):
+            name = match.group(2)
+        if name is None:
+            continue
+        cued = bool(
+            LOCATION_CUE_BEFORE.search(text, max(match.start() - 20, 0), match.start())
+            or LOCATION_CUE_AFTER.match(text, match.end())
+        )
+        if cued or name.lower() not in AMBIGUOUS_NAMES:
+            return name, cued
+    return None, False
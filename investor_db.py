@@ -0,0 +1,652 @@
+"""Investor database: columnar store, search indexes and the compiled binary format.
+
+The compiled file is built offline from investors.json with
+
+    python investor_db.py [investors.json] [investors.db]
+
+and memory-mapped at startup, so every worker process on a host shares the
+same pages. If the compiled file is missing, from another format version or
+older than investors.json, the loader falls back to parsing the JSON and writes
+the compiled file for the next process to map.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from context_builder import estimate_tokens
+from geography import parse_countries, resolve_geography
+from retrieval import RetrievalEngine, expand_keywords
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL_FIELDS = ("type", "stage", "countries")
+TEXT_FIELDS = ("name", "thesis", "hq", "website")
+CHEQUE_FIELDS = ("cheque_min", "cheque_max")
+INVESTOR_FIELDS = ("name", "type", "countries", "stage", "thesis", "cheque_min", "cheque_max", "hq", "website")
+
+# Longest thesis and countries quoted in an investor's prompt snippet
+SNIPPET_THESIS_CHARS = 300
+SNIPPET_COUNTRIES_CHARS = 100
+
+# Categorical fields the index keeps row postings for
+POSTING_FIELDS = ("type", "countries")
+
+# Stage buckets used by the investor search. Each query stage maps to the
+# investor stage labels that count as a fit for it.
+STAGE_BUCKETS = {
+    "pre-seed": ("prototype", "idea", "early revenue"),
+    "seed": ("early revenue", "prototype"),
+    "series a": ("scaling", "growth"),
+}
+
+# Approximate rates, only used to compare cheque sizes across currencies
+USD_PER_UNIT = {"USD": 1.0, "GBP": 1.27, "EUR": 1.08}
+CURRENCY_SYMBOLS = {"$": "USD", "£": "GBP", "€": "EUR"}
+CURRENCY_CODES = {"usd": "USD", "gbp": "GBP", "eur": "EUR"}
+AMOUNT_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "mn": 1e6, "million": 1e6}
+AMOUNT_PATTERN = re.compile(
+    r"(?P<symbol>[$£€])?\s*(?P<code>usd|gbp|eur)?\s*(?P<number>\d+(?:,\d{3})*(?:\.\d+)?)"
+    r"\s*(?P<multiplier>k|thousand|mm|mn|million|m)?\b\s*(?P<code_after>usd|gbp|eur)?",
+    re.IGNORECASE
+)
+
+# A cheque smaller than this share of the round isn't worth a slot in the shortlist
+MIN_CHEQUE_SHARE = 0.02
+
+MAGIC = b"FCINVDB\0"
+FORMAT_VERSION = 4
+SECTION_ALIGNMENT = 8
+RETRIEVAL_ARRAYS = ("idf", "term_indptr", "term_rows", "term_weights", "term_vectors", "doc_vectors")
+
+
+def parse_amount(text, default_currency="USD"):
+    """Parse an amount like '$250000', '£250k' or '1.5m EUR' into US dollars (None if there is none)"""
+    match = AMOUNT_PATTERN.search(text)
+    if not match:
+        return None
+    amount = float(match["number"].replace(",", ""))
+    if match["multiplier"]:
+        amount *= AMOUNT_MULTIPLIERS[match["multiplier"].lower()]
+    if match["symbol"]:
+        currency = CURRENCY_SYMBOLS[match["symbol"]]
+    elif match["code"] or match["code_after"]:
+        currency = CURRENCY_CODES[(match["code"] or match["code_after"]).lower()]
+    else:
+        currency = default_currency
+    return amount * USD_PER_UNIT[currency]
+
+
+def parse_cheque(value):
+    """Parse a cheque amount like '$250000' into US dollars (NaN when missing)"""
+    amount = parse_amount(value)
+    return math.nan if amount is None else amount
+
+
+def format_cheque(amount):
+    return "" if math.isnan(amount) else f"${amount:.0f}"
+
+
+def render_snippet(inv):
+    """An investor's Markdown entry for the AI context; rendered once per investor when the store is built"""
+    parts = [f"**{inv['name']}** ({inv['type']})"]
+    if inv.get('stage'):
+        parts.append(f"  - Stage: {inv['stage']}")
+    if inv.get('thesis'):
+        parts.append(f"  - Thesis: {inv.truncated('thesis', SNIPPET_THESIS_CHARS)}")
+    if inv.get('cheque_min') or inv.get('cheque_max'):
+        cheque = f"{inv.get('cheque_min', '?')} - {inv.get('cheque_max', '?')}"
+        parts.append(f"  - Cheque size: {cheque}")
+    if inv.get('countries'):
+        parts.append(f"  - Geography: {inv.truncated('countries', SNIPPET_COUNTRIES_CHARS)}")
+    if inv.get('website'):
+        parts.append(f"  - Website: {inv['website']}")
+    return "\n".join(parts)
+
+
+def normalize_stage_query(stage):
+    """Map a free-text stage to one of the STAGE_BUCKETS keys"""
+    stage_lower = stage.lower()
+    if 'pre-seed' in stage_lower or 'prototype' in stage_lower or 'idea' in stage_lower:
+        return "pre-seed"
+    if 'seed' in stage_lower or 'early revenue' in stage_lower:
+        return "seed"
+    if 'series a' in stage_lower or 'scaling' in stage_lower:
+        return "series a"
+    return None
+
+
+class TextColumn:
+    """Free-text column stored as one UTF-8 blob plus row byte offsets"""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_values(cls, values):
+        encoded = [value.encode("utf-8") for value in values]
+        offsets = array("Q", [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        return cls(offsets, b"".join(encoded))
+
+    def __getitem__(self, row):
+        return str(self.blob[self.offsets[row]:self.offsets[row + 1]], "utf-8")
+
+    def has_value(self, row):
+        return self.offsets[row + 1] > self.offsets[row]
+
+    def truncated(self, row, limit):
+        """The row's text cut to limit characters, decoding only what is needed from the blob"""
+        start, end = self.offsets[row], self.offsets[row + 1]
+        # A UTF-8 character is at most 4 bytes, so a longer row has more than limit characters
+        if end - start > 4 * (limit + 1):
+            return str(self.blob[start:start + 4 * (limit + 1)], "utf-8", "ignore")[:limit] + "..."
+        value = str(self.blob[start:end], "utf-8")
+        return value[:limit] + "..." if len(value) > limit else value
+
+
+class CategoricalColumn:
+    """Column stored as interned categories plus per-row codes
+
+    Codes are 32-bit: countries lists are close to unique per investor, so a growing
+    database can pass the 65,535 categories that 16-bit codes could address.
+    """
+
+    def __init__(self, categories, codes):
+        self.categories = [sys.intern(category) for category in categories]
+        self.codes = codes
+
+    @classmethod
+    def from_values(cls, values):
+        categories = []
+        codes = array("I")
+        lookup = {}
+        for value in values:
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(categories)
+                categories.append(value)
+            codes.append(code)
+        return cls(categories, codes)
+
+    def __getitem__(self, row):
+        return self.categories[self.codes[row]]
+
+    def has_value(self, row):
+        return bool(self[row])
+
+    def truncated(self, row, limit):
+        value = self[row]
+        return value[:limit] + "..." if len(value) > limit else value
+
+
+class InvestorView:
+    """Read-only, dict-like view of one investor row in an InvestorStore"""
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, field):
+        return self.store.value(self.row, field)
+
+    def get(self, field, default=None):
+        if field not in INVESTOR_FIELDS:
+            return default
+        return self.store.value(self.row, field)
+
+    def keys(self):
+        return INVESTOR_FIELDS
+
+    def truncated(self, field, limit):
+        return self.store.columns[field].truncated(self.row, limit)
+
+    @property
+    def snippet(self):
+        """The investor's prepared Markdown entry for the AI context"""
+        return self.store.columns["snippet"][self.row]
+
+    @property
+    def snippet_tokens(self):
+        return self.store.columns["snippet_tokens"][self.row]
+
+
+class InvestorStore:
+    """Columnar investor database: categorical, numeric and text-blob columns
+
+    Alongside the fields, each row's prompt snippet and its estimated token count
+    are stored, so context assembly never formats investors.
+    """
+
+    def __init__(self, size, columns, buffer=None):
+        self.size = size
+        self.columns = columns
+        # Keeps the memory map alive for as long as the columns point into it
+        self.buffer = buffer
+
+    @classmethod
+    def from_records(cls, records):
+        columns = {}
+        for field in CATEGORICAL_FIELDS:
+            columns[field] = CategoricalColumn.from_values([r.get(field) or "" for r in records])
+        for field in TEXT_FIELDS:
+            columns[field] = TextColumn.from_values([r.get(field) or "" for r in records])
+        for field in CHEQUE_FIELDS:
+            columns[field] = array("d", (parse_cheque(r.get(field) or "") for r in records))
+        store = cls(len(records), columns)
+        snippets = [render_snippet(investor) for investor in store]
+        columns["snippet"] = TextColumn.from_values(snippets)
+        columns["snippet_tokens"] = array("I", (estimate_tokens(snippet) for snippet in snippets))
+        return store
+
+    def value(self, row, field):
+        if field in CHEQUE_FIELDS:
+            return format_cheque(self.columns[field][row])
+        return self.columns[field][row]
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, row):
+        return InvestorView(self, row)
+
+    def __iter__(self):
+        return (InvestorView(self, row) for row in range(self.size))
+
+
+class Postings:
+    """Row lists for a sequence of keys, stored as offsets into one flat rows array"""
+
+    def __init__(self, offsets, rows):
+        self.offsets = offsets
+        self.rows = rows
+
+    @classmethod
+    def from_lists(cls, row_lists):
+        offsets = array("I", [0])
+        rows = array("I")
+        for row_list in row_lists:
+            rows.extend(sorted(row_list))
+            offsets.append(len(rows))
+        return cls(offsets, rows)
+
+    def __getitem__(self, key):
+        return self.rows[self.offsets[key]:self.offsets[key + 1]]
+
+
+class InvestorIndex:
+    """Search indexes over the investor store"""
+
+    def __init__(self, investors, retrieval, category_postings, stage_postings, country_vocab, country_postings,
+                 cheque_order):
+        self.investors = investors
+        self.retrieval = retrieval
+        self.category_postings = category_postings
+        self.stage_postings = stage_postings
+        self.country_vocab = country_vocab
+        self.country_postings = country_postings
+        # field -> (sorted amounts, rows in the same order), for rows that have the amount
+        self.cheque_order = cheque_order
+        self._geography_cache = {}
+
+        # Only investors with a thesis or a stage are worth recommending
+        has_thesis = np.diff(np.asarray(investors.columns["thesis"].offsets)) > 0
+        self.searchable = has_thesis | self._has_category("stage")
+        self.has_countries = self._has_category("countries")
+
+    @classmethod
+    def build(cls, investors):
+        category_postings = {}
+        for field in POSTING_FIELDS + ("stage",):
+            column = investors.columns[field]
+            row_lists = [[] for _ in column.categories]
+            for row, code in enumerate(column.codes):
+                row_lists[code].append(row)
+            category_postings[field] = Postings.from_lists(row_lists)
+
+        stages = investors.columns["stage"]
+        stage_postings = {}
+        for bucket, labels in STAGE_BUCKETS.items():
+            rows = array("I")
+            for code, category in enumerate(stages.categories):
+                if any(label in category.lower() for label in labels):
+                    rows.extend(category_postings["stage"][code])
+            stage_postings[bucket] = array("I", sorted(rows))
+
+        countries = investors.columns["countries"]
+        country_rows = {}
+        for code, category in enumerate(countries.categories):
+            for country in parse_countries(category):
+                country_rows.setdefault(country, []).extend(category_postings["countries"][code])
+        country_vocab = sorted(country_rows)
+
+        cheque_order = {}
+        for field in CHEQUE_FIELDS:
+            amounts = investors.columns[field]
+            rows = sorted((row for row in range(len(investors)) if not math.isnan(amounts[row])), key=amounts.__getitem__)
+            cheque_order[field] = (array("d", (amounts[row] for row in rows)), array("I", rows))
+
+        retrieval = RetrievalEngine.build(
+            [f"{inv['thesis']} {inv['stage']} {inv['type']}" for inv in investors],
+            [inv["thesis"] for inv in investors]
+        )
+
+        return cls(
+            investors,
+            retrieval,
+            {field: category_postings[field] for field in POSTING_FIELDS},
+            stage_postings,
+            {country: i for i, country in enumerate(country_vocab)},
+            Postings.from_lists(country_rows[country] for country in country_vocab),
+            cheque_order
+        )
+
+    def _has_category(self, field):
+        """Boolean mask of the rows with a non-empty value in a categorical field"""
+        column = self.investors.columns[field]
+        non_empty = np.array([bool(category) for category in column.categories] or [False])
+        return non_empty[np.asarray(column.codes, dtype=np.intp)]
+
+    def _category_matches(self, field, predicate):
+        """Rows whose category in field satisfies predicate(category_lower)"""
+        column = self.investors.columns[field]
+        rows = [
+            np.asarray(self.category_postings[field][code])
+            for code, category in enumerate(column.categories) if category and predicate(category.lower())
+        ]
+        return np.concatenate(rows).astype(np.intp) if rows else np.zeros(0, dtype=np.intp)
+
+    def geography_postings(self, geography):
+        """Investors whose countries cover geography (a country, alias or region)"""
+        if geography in self._geography_cache:
+            return self._geography_cache[geography]
+
+        countries = resolve_geography(geography)
+        if countries is not None:
+            rows = [
+                np.asarray(self.country_postings[self.country_vocab[country]])
+                for country in countries if country in self.country_vocab
+            ]
+            rows = np.unique(np.concatenate(rows)).astype(np.intp) if rows else np.zeros(0, dtype=np.intp)
+        else:
+            # Not in the taxonomy, so fall back to matching the raw text
+            geography_lower = geography.lower()
+            rows = self._category_matches("countries", lambda countries_lower: geography_lower in countries_lower)
+        self._geography_cache[geography] = rows
+        return rows
+
+    def geography_excluded(self, geography):
+        """Mask of investors that list countries, none of which are covered by geography"""
+        key = ("excluded", geography)
+        if key not in self._geography_cache:
+            excluded = self.has_countries.copy()
+            excluded[self.geography_postings(geography)] = False
+            self._geography_cache[key] = excluded
+        return self._geography_cache[key]
+
+    def cheque_excluded(self, raise_amount):
+        """Mask of investors whose cheque range can't fit a round of raise_amount US dollars
+
+        That is, their smallest cheque is bigger than the round, or their largest is below
+        MIN_CHEQUE_SHARE of it. Investors without cheque data are never excluded.
+        """
+        min_amounts, min_rows = self.cheque_order["cheque_min"]
+        max_amounts, max_rows = self.cheque_order["cheque_max"]
+        excluded = np.zeros(len(self.investors), dtype=bool)
+        excluded[np.asarray(min_rows[bisect_right(min_amounts, raise_amount):], dtype=np.intp)] = True
+        excluded[np.asarray(max_rows[:bisect_left(max_amounts, raise_amount * MIN_CHEQUE_SHARE)], dtype=np.intp)] = True
+        return excluded
+
+    def type_matches(self, investor_type):
+        """Investors whose type contains investor_type"""
+        investor_type = investor_type.lower()
+        return self._category_matches("type", lambda type_lower: investor_type in type_lower)
+
+    def search(self, stage=None, sector_keywords=None, geography=None, investor_type=None, max_results=20,
+               raise_amount=None, strict_geography=False, strict_raise=True):
+        """Score every investor in one vectorized pass and return the best matches
+
+        Sector keywords are scored by BM25 + embedding relevance rather than substring
+        matches, worth up to 2 points per keyword. raise_amount (US dollars) drops investors
+        whose cheque range can't fit the round, or without strict_raise is only worth a
+        point to those whose range fits. strict_geography drops investors whose listed
+        countries don't cover geography; investors with no countries listed are kept
+        either way.
+        """
+        scores = np.zeros(len(self.investors), dtype=np.float32)
+
+        if stage:
+            bucket = normalize_stage_query(stage)
+            if bucket:
+                scores[np.asarray(self.stage_postings[bucket], dtype=np.intp)] += 3
+
+        if sector_keywords:
+            scores += 2 * len(sector_keywords) * self.retrieval.relevance(expand_keywords(sector_keywords))
+
+        if geography:
+            scores[self.geography_postings(geography)] += 2
+
+        if investor_type:
+            scores[np.unique(self.type_matches(investor_type))] += 1
+
+        eligible = (scores > 0) & self.searchable
+        if raise_amount and strict_raise:
+            eligible &= ~self.cheque_excluded(raise_amount)
+        elif raise_amount:
+            scores[eligible & ~self.cheque_excluded(raise_amount)] += 1
+        if geography and strict_geography:
+            eligible &= ~self.geography_excluded(geography)
+
+        rows = np.flatnonzero(eligible)
+        if len(rows) > max_results > 0:
+            # Partial selection: keep everything scoring at least the max_results-th best,
+            # so ties at the cut-off are still broken by row order below
+            cutoff = np.partition(scores[rows], len(rows) - max_results)[len(rows) - max_results]
+            rows = rows[scores[rows] >= cutoff]
+        ranked = rows[np.lexsort((rows, -scores[rows]))]
+        return [self.investors[int(row)] for row in ranked[:max_results]]
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def compile_investor_db(json_path, db_path):
+    """Compile investors.json into the binary format read by load_compiled_index"""
+    with open(json_path, "r") as f:
+        index = InvestorIndex.build(InvestorStore.from_records(json.load(f)))
+    return write_investor_db(index, json_path, db_path)
+
+
+def write_investor_db(index, json_path, db_path):
+    """Write an index built from json_path in the binary format read by load_compiled_index"""
+    store = index.investors
+
+    sections = {}
+    for field in CATEGORICAL_FIELDS:
+        sections[f"{field}.codes"] = store.columns[field].codes
+    for field in TEXT_FIELDS:
+        sections[f"{field}.offsets"] = store.columns[field].offsets
+        sections[f"{field}.blob"] = store.columns[field].blob
+    for field in CHEQUE_FIELDS:
+        sections[field] = store.columns[field]
+    sections["snippet.offsets"] = store.columns["snippet"].offsets
+    sections["snippet.blob"] = store.columns["snippet"].blob
+    sections["snippet_tokens"] = store.columns["snippet_tokens"]
+    for field, postings in index.category_postings.items():
+        sections[f"{field}_postings.offsets"] = postings.offsets
+        sections[f"{field}_postings.rows"] = postings.rows
+    for bucket, rows in index.stage_postings.items():
+        sections[f"stage_postings.{bucket}"] = rows
+    sections["country_postings.offsets"] = index.country_postings.offsets
+    sections["country_postings.rows"] = index.country_postings.rows
+    for field, (amounts, rows) in index.cheque_order.items():
+        sections[f"{field}_order.amounts"] = amounts
+        sections[f"{field}_order.rows"] = rows
+    for name in RETRIEVAL_ARRAYS:
+        sections[f"retrieval.{name}"] = getattr(index.retrieval, name)
+
+    source_stat = os.stat(json_path)
+    header = {
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "source_sha256": file_sha256(json_path),
+        "source_size": source_stat.st_size,
+        "source_mtime_ns": source_stat.st_mtime_ns,
+        "rows": len(store),
+        "categories": {field: store.columns[field].categories for field in CATEGORICAL_FIELDS},
+        "retrieval_vocab": sorted(index.retrieval.vocab, key=index.retrieval.vocab.get),
+        "embedding_dimensions": index.retrieval.doc_vectors.shape[1],
+        "country_vocab": sorted(index.country_vocab, key=index.country_vocab.get),
+        "sections": {},
+    }
+
+    # Section offsets are relative to the end of the header block, so they can be
+    # laid out before the header's own length is known
+    payload = bytearray()
+    for name, data in sections.items():
+        payload.extend(b"\0" * (-len(payload) % SECTION_ALIGNMENT))
+        if isinstance(data, np.ndarray):
+            # NumPy dtype chars match the array/memoryview typecodes for the dtypes used here
+            typecode, length, data = data.dtype.char, data.nbytes, data.tobytes()
+        elif isinstance(data, array):
+            typecode, length, data = data.typecode, len(data) * data.itemsize, data.tobytes()
+        else:
+            typecode, length = "B", len(data)
+        header["sections"][name] = [len(payload), length, typecode]
+        payload.extend(data)
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-(len(MAGIC) + 4 + len(header_bytes)) % SECTION_ALIGNMENT)
+
+    # Per process, as workers that all fell back to the JSON may write at once
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(4, "little"))
+        f.write(header_bytes)
+        f.write(payload)
+    os.replace(tmp_path, db_path)
+    return header
+
+
+def read_header(buffer):
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a compiled investor database")
+    header_length = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 4], "little")
+    header_start = len(MAGIC) + 4
+    header = json.loads(bytes(buffer[header_start:header_start + header_length]))
+    return header, header_start + header_length
+
+
+def is_fresh(header, json_path):
+    """Whether the compiled header matches the current investors.json"""
+    if header.get("version") != FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+        return False
+    source_stat = os.stat(json_path)
+    if source_stat.st_size != header["source_size"]:
+        return False
+    if source_stat.st_mtime_ns == header["source_mtime_ns"]:
+        return True
+    # The file was touched (e.g. by a checkout); only a content change makes it stale
+    return file_sha256(json_path) == header["source_sha256"]
+
+
+def load_compiled_index(db_path, json_path):
+    """Memory-map a compiled investor database, or return None if it is missing or stale"""
+    try:
+        with open(db_path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(buffer)
+    try:
+        header, data_start = read_header(view)
+    except ValueError as e:
+        logger.warning("Ignoring %s: %s", db_path, e)
+        return None
+    if not is_fresh(header, json_path):
+        logger.warning("%s is stale, loading %s instead", db_path, json_path)
+        return None
+
+    def section(name):
+        offset, length, typecode = header["sections"][name]
+        data = view[data_start + offset:data_start + offset + length]
+        return data if typecode == "B" else data.cast(typecode)
+
+    columns = {}
+    for field in CATEGORICAL_FIELDS:
+        columns[field] = CategoricalColumn(header["categories"][field], section(f"{field}.codes"))
+    for field in TEXT_FIELDS:
+        columns[field] = TextColumn(section(f"{field}.offsets"), section(f"{field}.blob"))
+    for field in CHEQUE_FIELDS:
+        columns[field] = section(field)
+    columns["snippet"] = TextColumn(section("snippet.offsets"), section("snippet.blob"))
+    columns["snippet_tokens"] = section("snippet_tokens")
+    store = InvestorStore(header["rows"], columns, buffer=buffer)
+
+    # Zero-copy NumPy views onto the memory map
+    vocab = {token: i for i, token in enumerate(header["retrieval_vocab"])}
+    dimensions = header["embedding_dimensions"]
+    retrieval = RetrievalEngine(
+        vocab,
+        np.asarray(section("retrieval.idf")),
+        np.asarray(section("retrieval.term_indptr")),
+        np.asarray(section("retrieval.term_rows")),
+        np.asarray(section("retrieval.term_weights")),
+        np.asarray(section("retrieval.term_vectors")).reshape(len(vocab), dimensions),
+        np.asarray(section("retrieval.doc_vectors")).reshape(header["rows"], dimensions)
+    )
+
+    return InvestorIndex(
+        store,
+        retrieval,
+        {
+            field: Postings(section(f"{field}_postings.offsets"), section(f"{field}_postings.rows"))
+            for field in POSTING_FIELDS
+        },
+        {bucket: section(f"stage_postings.{bucket}") for bucket in STAGE_BUCKETS},
+        {country: i for i, country in enumerate(header["country_vocab"])},
+        Postings(section("country_postings.offsets"), section("country_postings.rows")),
+        {field: (section(f"{field}_order.amounts"), section(f"{field}_order.rows")) for field in CHEQUE_FIELDS}
+    )
+
+
+def load_investor_index(json_path="investors.json", db_path="investors.db"):
+    """Load the investor index from the compiled database, falling back to the JSON source
+
+    After a fallback the compiled database is rewritten, so later processes map it.
+    """
+    index = load_compiled_index(db_path, json_path)
+    if index is not None:
+        return index
+    with open(json_path, "r") as f:
+        index = InvestorIndex.build(InvestorStore.from_records(json.load(f)))
+    try:
+        write_investor_db(index, json_path, db_path)
+        logger.info("Compiled %s into %s", json_path, db_path)
+    except OSError as e:
+        logger.warning("Could not write %s: %s", db_path, e)
+    return index
+
+
+if __name__ == "__main__":
+    json_path = sys.argv[1] if len(sys.argv) > 1 else "investors.json"
+    db_path = sys.argv[2] if len(sys.argv) > 2 else "investors.db"
+    header = compile_investor_db(json_path, db_path)
+    print(f"Compiled {header['rows']} investors from {json_path} into {db_path}")
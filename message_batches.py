@@ -0,0 +1,119 @@
+"""Bulk reviews through the Message Batches API.
+
+Interactive requests pay for low latency. Bulk work such as reviewing a whole
+cohort, or re-reviewing updated decks overnight, doesn't need it. Here many
+review requests go into one batch submission. The batch is polled until it has
+ended, and each result is mapped back to its custom_id (the deck's digest).
+
+The submitted batch's id and the records waiting on it are saved next to the
+output, so an interrupted run picks the same batch up again instead of paying
+for it twice. Calls go through ApiGateway, so ANTHROPIC_BASE_URL can point at a
+local stub server implementing /v1/messages/batches, such as tests/mock_api.py.
+"""
+
+import json
+import logging
+import os
+import time
+
+from metrics import record_usage, span
+
+logger = logging.getLogger(__name__)
+
+BATCH_POLL_INTERVAL = float(os.environ.get("BATCH_POLL_INTERVAL", 60))
+# The API accepts up to 100,000 requests per batch; larger runs continue on the next run
+BATCH_MAX_REQUESTS = 10_000
+
+
+def submit_batch(gateway, requests):
+    """Submit {custom_id: messages.create arguments} as one batch and return its id"""
+    batch = gateway.with_retries(lambda: gateway.client.messages.batches.create(requests=[
+        {"custom_id": custom_id, "params": params} for custom_id, params in requests.items()
+    ]))
+    logger.info("Submitted batch %s with %d requests", batch.id, len(requests))
+    return batch.id
+
+
+def wait_for_batch(gateway, batch_id, poll_interval=BATCH_POLL_INTERVAL):
+    """Poll until the batch has ended"""
+    with span("batch_wait"):
+        while True:
+            batch = gateway.with_retries(lambda: gateway.client.messages.batches.retrieve(batch_id))
+            counts = batch.request_counts
+            if batch.processing_status == "ended":
+                logger.info(
+                    "Batch %s ended: %d succeeded, %d errored, %d expired, %d canceled", batch_id,
+                    counts.succeeded, counts.errored, counts.expired, counts.canceled
+                )
+                return batch
+            logger.info("Batch %s: %d of %d requests still processing", batch_id, counts.processing,
+                        counts.processing + counts.succeeded + counts.errored + counts.expired + counts.canceled)
+            time.sleep(poll_interval)
+
+
+def batch_results(gateway, batch_id):
+    """{custom_id: (reply text, None) or (None, error)} for an ended batch"""
+    results = {}
+    for entry in gateway.with_retries(lambda: gateway.client.messages.batches.results(batch_id)):
+        result = entry.result
+        if result.type == "succeeded":
+            record_usage(result.message.usage, result.message.model)
+            text = "".join(block.text for block in result.message.content if block.type == "text")
+            results[entry.custom_id] = (text, None)
+        elif result.type == "errored":
+            results[entry.custom_id] = (None, f"Review failed: {result.error.error.message}")
+        else:
+            results[entry.custom_id] = (None, f"Review {result.type}")
+    return results
+
+
+class BatchState:
+    """The in-flight batch's id and the records waiting for its results, kept on disk"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """(batch_id, {custom_id: record}), or None when no batch is in flight"""
+        try:
+            with open(self.path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return state["batch_id"], state["records"]
+
+    def save(self, batch_id, records):
+        with open(f"{self.path}.tmp", "w") as f:
+            json.dump({"batch_id": batch_id, "records": records}, f)
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def run_batch(gateway, state, records, requests, write, poll_interval=BATCH_POLL_INTERVAL):
+    """Review records through one batch and write each with its review
+
+    records and requests are keyed by custom_id. The batch is recorded in state as soon
+    as it is submitted, and state is cleared once every record has been written.
+    """
+    batch_id = submit_batch(gateway, requests)
+    state.save(batch_id, records)
+    finish_batch(gateway, state, batch_id, records, write, poll_interval)
+
+
+def finish_batch(gateway, state, batch_id, records, write, poll_interval=BATCH_POLL_INTERVAL):
+    """Wait for a submitted batch, then write its records with their reviews and clear state"""
+    wait_for_batch(gateway, batch_id, poll_interval)
+    results = batch_results(gateway, batch_id)
+    for custom_id, record in records.items():
+        review, error = results.get(custom_id, (None, "Review missing from batch results"))
+        if error:
+            record["error"] = error
+        else:
+            record["review"] = review
+        write(record)
+    state.clear()
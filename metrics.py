@@ -0,0 +1,198 @@
+"""Lightweight in-process metrics: per-stage latency spans and token usage.
+
+Each span times one stage of a request (extracting a page, searching investors,
+building the context, calling the API) and feeds a latency histogram for that
+stage. Token usage from API responses feeds counters. A background thread
+writes everything to METRICS_DIR every METRICS_EXPORT_INTERVAL seconds:
+
+    metrics.prom   Prometheus text format, for a local scraper (textfile collector)
+    spans.jsonl    one JSON object per finished span, moved to spans.jsonl.1 once
+                   it reaches METRICS_SPANS_MAX_BYTES (0 to never rotate)
+
+Set METRICS_DIR to an empty string to keep the metrics in memory only. Spans
+waiting for export are capped at MAX_BUFFERED_SPANS, oldest dropped first, so
+processes that never export (benchmarks, batch runs) don't grow without bound.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.environ.get("METRICS_DIR", ".metrics")
+METRICS_EXPORT_INTERVAL = float(os.environ.get("METRICS_EXPORT_INTERVAL", 10))
+METRICS_PREFIX = "copilot"
+MAX_BUFFERED_SPANS = 10_000
+METRICS_SPANS_MAX_BYTES = int(os.environ.get("METRICS_SPANS_MAX_BYTES", 50 * 1024 * 1024))
+
+# Upper bounds in seconds, from a cached page lookup up to a long streamed reply
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, observations at or below it) pairs, ending with +Inf"""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+def format_labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{str(value)}"' for key, value in items) + "}"
+
+
+def format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+class Registry:
+    """Histograms and counters keyed by metric name and labels, plus finished spans awaiting export"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.spans = deque(maxlen=MAX_BUFFERED_SPANS)
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def add_span(self, record):
+        with self.lock:
+            self.spans.append(record)
+
+    def take_spans(self):
+        with self.lock:
+            spans, self.spans = list(self.spans), deque(maxlen=MAX_BUFFERED_SPANS)
+        return spans
+
+    def prometheus_text(self):
+        lines = []
+        with self.lock:
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {METRICS_PREFIX}_{name} histogram")
+                for (key_name, labels), histogram in sorted(self.histograms.items()):
+                    if key_name != name:
+                        continue
+                    metric = f"{METRICS_PREFIX}_{name}"
+                    for bound, total in histogram.cumulative():
+                        lines.append(f"{metric}_bucket{format_labels(labels, le=format_bound(bound))} {total}")
+                    lines.append(f"{metric}_sum{format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{metric}_count{format_labels(labels)} {histogram.count}")
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {METRICS_PREFIX}_{name} counter")
+                for (key_name, labels), value in sorted(self.counters.items()):
+                    if key_name == name:
+                        lines.append(f"{METRICS_PREFIX}_{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def observe_stage(stage, seconds, status="ok", **labels):
+    """Record one timed stage in the latency histogram and the span log"""
+    REGISTRY.observe("stage_latency_seconds", seconds, stage=stage, status=status, **labels)
+    REGISTRY.add_span({"ts": time.time(), "stage": stage, "seconds": round(seconds, 6), "status": status, **labels})
+
+
+@contextmanager
+def span(stage, **labels):
+    """Time the body as one run of stage; failures are recorded with status="error" """
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        observe_stage(stage, time.perf_counter() - start, status, **labels)
+
+
+def record_usage(usage, model):
+    """Add an API response's token usage to the token counters"""
+    for field in USAGE_FIELDS:
+        tokens = getattr(usage, field, None) or 0
+        REGISTRY.increment("tokens_total", tokens, model=model, kind=field.replace("_tokens", ""))
+    REGISTRY.increment("api_responses_total", model=model)
+
+
+def rotate_if_full(path, max_bytes=METRICS_SPANS_MAX_BYTES):
+    """Move path to path.1, replacing the previous one, once it reaches max_bytes"""
+    try:
+        if max_bytes and os.path.getsize(path) >= max_bytes:
+            os.replace(path, f"{path}.1")
+    except FileNotFoundError:
+        pass
+
+
+def export_metrics(directory=METRICS_DIR, spans_max_bytes=METRICS_SPANS_MAX_BYTES):
+    """Append finished spans to spans.jsonl, rotating it by size, and rewrite metrics.prom"""
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    spans = REGISTRY.take_spans()
+    if spans:
+        spans_path = os.path.join(directory, "spans.jsonl")
+        rotate_if_full(spans_path, spans_max_bytes)
+        with open(spans_path, "a") as f:
+            f.writelines(json.dumps(record) + "\n" for record in spans)
+
+    # Written to a temp file and renamed, so a scraper never reads a half-written file
+    path = os.path.join(directory, "metrics.prom")
+    with open(f"{path}.tmp", "w") as f:
+        f.write(REGISTRY.prometheus_text())
+    os.replace(f"{path}.tmp", path)
+
+
+def start_exporter(directory=METRICS_DIR, interval=METRICS_EXPORT_INTERVAL):
+    """Export the metrics every interval seconds from a daemon thread"""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                export_metrics(directory)
+            except OSError as e:
+                logger.warning("Couldn't export metrics to %s: %s", directory, e)
+
+    thread = threading.Thread(target=run, name="metrics-exporter", daemon=True)
+    thread.start()
+    return thread
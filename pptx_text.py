@@ -0,0 +1,184 @@
+"""Streaming text extraction from PPTX files.
+
+A PPTX is a zip of XML parts. Rather than loading the whole presentation with
+python-pptx, the slide parts are streamed out of the zip one at a time, in
+presentation order, and only the shape tree is walked in Python. Embedded media
+is never read, and only one slide's XML is held at a time, so memory stays flat
+however large the deck. Besides text boxes and placeholders this picks up
+tables (one row per line, cells separated by " | "), shapes inside groups,
+chart titles and series names, and speaker notes.
+"""
+
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_C = "http://schemas.openxmlformats.org/drawingml/2006/chart"
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+A_P = f"{{{NS_A}}}p"
+A_T = f"{{{NS_A}}}t"
+A_BR = f"{{{NS_A}}}br"
+A_TC = f"{{{NS_A}}}tc"
+A_TR = f"{{{NS_A}}}tr"
+A_TBL = f"{{{NS_A}}}tbl"
+C_CHART = f"{{{NS_C}}}chart"
+C_TX = f"{{{NS_C}}}tx"
+C_CAT = f"{{{NS_C}}}cat"
+C_V = f"{{{NS_C}}}v"
+C_TITLE = f"{{{NS_C}}}title"
+P_C_SLD = f"{{{NS_P}}}cSld"
+P_SP_TREE = f"{{{NS_P}}}spTree"
+P_SP = f"{{{NS_P}}}sp"
+P_GRP_SP = f"{{{NS_P}}}grpSp"
+P_GRAPHIC_FRAME = f"{{{NS_P}}}graphicFrame"
+P_TX_BODY = f"{{{NS_P}}}txBody"
+P_NV_SP_PR = f"{{{NS_P}}}nvSpPr"
+P_NV_PR = f"{{{NS_P}}}nvPr"
+P_PH = f"{{{NS_P}}}ph"
+P_SLD_ID = f"{{{NS_P}}}sldId"
+R_ID = f"{{{NS_R}}}id"
+
+REL_SLIDE = "/slide"
+REL_NOTES = "/notesSlide"
+REL_CHART = "/chart"
+
+PRESENTATION_PART = "ppt/presentation.xml"
+
+
+def rels_path(part):
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+def read_rels(archive, part):
+    """{relationship id: (type, target part)} for a part, or {} if it has no relationships"""
+    try:
+        data = archive.read(rels_path(part))
+    except KeyError:
+        return {}
+    rels = {}
+    for rel in ET.fromstring(data).iter(f"{{{NS_REL}}}Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(posixpath.dirname(part), target))
+        rels[rel.get("Id")] = (rel.get("Type", ""), target)
+    return rels
+
+
+def paragraph_lines(txbody):
+    """Non-empty paragraphs of a text body, with line breaks kept"""
+    lines = []
+    for paragraph in txbody.iter(A_P):
+        text = "".join(
+            "\n" if node.tag == A_BR else node.text or ""
+            for node in paragraph.iter() if node.tag in (A_T, A_BR)
+        ).strip()
+        if text:
+            lines.append(text)
+    return lines
+
+
+def table_lines(table):
+    """One line per table row, cells separated by " | " """
+    lines = []
+    for row in table.iter(A_TR):
+        cells = [" ".join(paragraph_lines(cell)) for cell in row.iter(A_TC)]
+        if any(cells):
+            lines.append(" | ".join(cells))
+    return lines
+
+
+def placeholder_type(shape):
+    placeholder = shape.find(f"{P_NV_SP_PR}/{P_NV_PR}/{P_PH}")
+    return None if placeholder is None else placeholder.get("type", "body")
+
+
+def shape_lines(shapes, chart_ids, placeholder_types=None):
+    """Text lines of a shape tree in document order, descending into groups"""
+    lines = []
+    for shape in shapes:
+        if shape.tag == P_GRP_SP:
+            lines += shape_lines(shape, chart_ids, placeholder_types)
+        elif shape.tag == P_SP:
+            txbody = shape.find(P_TX_BODY)
+            if txbody is not None and (placeholder_types is None or placeholder_type(shape) in placeholder_types):
+                lines += paragraph_lines(txbody)
+        elif shape.tag == P_GRAPHIC_FRAME and placeholder_types is None:
+            for table in shape.iter(A_TBL):
+                lines += table_lines(table)
+            chart_ids += [chart.get(R_ID) for chart in shape.iter(C_CHART)]
+    return lines
+
+
+def parse_shapes(stream, chart_ids=None, placeholder_types=None):
+    """Text lines of a slide or notes part, in document order
+
+    Paragraphs become lines and table rows become " | "-joined lines. The r:ids of
+    charts are added to chart_ids. With placeholder_types, only text in placeholders
+    of those types is kept (notes pages also hold the slide number and an image).
+    """
+    tree = ET.parse(stream).find(f"{P_C_SLD}/{P_SP_TREE}")
+    if tree is None:
+        return []
+    return shape_lines(tree, chart_ids if chart_ids is not None else [], placeholder_types)
+
+
+def parse_chart(stream):
+    """Title, series names and category labels of a chart part"""
+    root = ET.parse(stream).getroot()
+    lines = []
+    for title in root.iter(C_TITLE):
+        lines += paragraph_lines(title)
+    labels = []
+    for label_root in (*root.iter(C_TX), *root.iter(C_CAT)):
+        for value in label_root.iter(C_V):
+            label = (value.text or "").strip()
+            if label and label not in labels:
+                labels.append(label)
+    if labels:
+        lines.append(", ".join(labels))
+    return lines
+
+
+def slide_parts(archive):
+    """Slide part names in presentation order"""
+    rels = read_rels(archive, PRESENTATION_PART)
+    with archive.open(PRESENTATION_PART) as stream:
+        ids = [elem.get(R_ID) for _, elem in ET.iterparse(stream) if elem.tag == P_SLD_ID]
+    return [rels[rel_id][1] for rel_id in ids if rel_id in rels and rels[rel_id][0].endswith(REL_SLIDE)]
+
+
+def iter_slides(file):
+    """Yield {"number", "text", "notes"} for each slide of a PPTX file, in order
+
+    text holds the slide's text boxes, tables, groups and charts; notes the speaker notes.
+    """
+    with zipfile.ZipFile(file) as archive:
+        names = set(archive.namelist())
+        for number, part in enumerate(slide_parts(archive), 1):
+            if part not in names:
+                continue
+            rels = read_rels(archive, part)
+            chart_ids = []
+            with archive.open(part) as stream:
+                lines = parse_shapes(stream, chart_ids)
+            for rel_id in chart_ids:
+                rel_type, target = rels.get(rel_id, ("", None))
+                if rel_type.endswith(REL_CHART) and target in names:
+                    with archive.open(target) as stream:
+                        lines += parse_chart(stream)
+
+            notes = []
+            for rel_type, target in rels.values():
+                if rel_type.endswith(REL_NOTES) and target in names:
+                    with archive.open(target) as stream:
+                        notes = parse_shapes(stream, placeholder_types={"body"})
+            yield {"number": number, "text": "\n".join(lines), "notes": "\n".join(notes)}
@@ -0,0 +1,64 @@
+"""In-process cache of Claude replies to fully deterministic requests.
+
+Starter prompts are single-turn requests, so the same deck and the same starter
+always send the same input. Their replies are cached under a hash of everything
+that shapes the reply, expire after a TTL, and are evicted least recently used
+once the cache outgrows its size limit.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", 24 * 60 * 60))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 20 * 1024 * 1024))
+
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def response_cache_key(model, max_tokens, system_prompt, messages):
+    """Cache key for a request: the model and its settings, plus hashes of the system prompt and messages"""
+    prompt = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+    return f"{model}:{max_tokens}:{sha256_text(system_prompt)}:{sha256_text(prompt)}"
+
+
+class ResponseCache:
+    """Thread-safe LRU of reply texts with a TTL and a total size limit"""
+
+    def __init__(self, ttl=RESPONSE_CACHE_TTL, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """The cached reply for key, or None on a miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            stored_at, text = entry
+            if time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return text
+
+    def put(self, key, text):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic(), text)
+            self.size += len(text.encode("utf-8"))
+            while self.size > self.max_bytes and self.entries:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        _, text = self.entries.pop(key)
+        self.size -= len(text.encode("utf-8"))
@@ -0,0 +1,243 @@
+"""Local BM25 + LSA retrieval over investor theses, stages and types.
+
+Each investor is a document made of its thesis, stage and type. BM25 term
+weights are precomputed into a term -> (rows, weights) matrix, so scoring a
+query is one weighted bincount over the postings of its terms. Documents also
+get a dense embedding from a truncated SVD of their TF-IDF matrix (latent
+semantic analysis), which lets "machine learning" theses score for an "ai"
+query. Both matrices are contiguous NumPy arrays, so the compiled investor
+database can store them and load them back with np.frombuffer.
+"""
+
+import math
+import re
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from have in is it of on or our that the their this to we with
+you your i us they them its into across all any also who which will can more
+""".split())
+
+# Query expansion for the sector keywords the app detects
+SECTOR_SYNONYMS = {
+    "ai": ("ai", "artificial intelligence", "machine learning", "ml", "deep learning", "generative"),
+    "fintech": ("fintech", "financial services", "payments", "banking", "insurtech", "lending"),
+    "healthtech": ("healthtech", "digital health", "healthcare", "medtech"),
+    "health": ("health", "healthcare", "medtech", "wellbeing"),
+    "saas": ("saas", "software", "subscription"),
+    "b2b": ("b2b", "enterprise", "business software"),
+    "b2c": ("b2c", "consumer", "d2c", "dtc"),
+    "climate": ("climate", "climatetech", "carbon", "decarbonisation", "decarbonization", "net zero"),
+    "sustainability": ("sustainability", "sustainable", "circular economy", "esg"),
+    "cleantech": ("cleantech", "clean energy", "renewable", "renewables"),
+    "edtech": ("edtech", "education", "learning"),
+    "proptech": ("proptech", "real estate", "property", "construction"),
+    "foodtech": ("foodtech", "food", "agrifood"),
+    "agtech": ("agtech", "agritech", "agriculture", "farming"),
+    "biotech": ("biotech", "life sciences", "therapeutics"),
+    "deeptech": ("deeptech", "deep tech", "hardware"),
+    "ecommerce": ("ecommerce", "e commerce", "commerce", "retail"),
+    "web3": ("web3", "web 3", "blockchain", "crypto", "defi"),
+    "cybersecurity": ("cybersecurity", "cyber security", "security"),
+    "iot": ("iot", "internet of things", "connected devices"),
+    "hr": ("hr", "hrtech", "human resources", "recruitment", "talent"),
+    "legal": ("legal", "legaltech", "regtech"),
+    "mobility": ("mobility", "transport", "transportation", "automotive"),
+    "impact": ("impact", "social impact", "purpose"),
+    "mental health": ("mental health", "wellbeing", "therapy"),
+    "future of work": ("future of work", "workplace", "productivity"),
+    "diversity": ("diversity", "diverse founders", "underrepresented", "female founders"),
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+EMBEDDING_DIMENSIONS = 64
+# The SVD is fitted on at most this many documents; the rest are folded in, in chunks
+EMBEDDING_FIT_DOCS = 5000
+EMBEDDING_CHUNK_DOCS = 4096
+# Share of the fused relevance that comes from the LSA embedding rather than BM25
+EMBEDDING_WEIGHT = 0.3
+# Cosine similarity below this is treated as noise rather than relatedness
+MIN_EMBEDDING_SIMILARITY = 0.2
+
+
+# Raw token -> normalized token ("" for stopwords); the vocabulary is small, so this stays small
+_NORMALIZED_TOKENS = {}
+
+
+def normalize_token(token):
+    if token in STOPWORDS:
+        return ""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Lower-case alphanumeric tokens without stopwords, with a plural 's' stripped"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        normalized = _NORMALIZED_TOKENS.get(token)
+        if normalized is None:
+            if len(_NORMALIZED_TOKENS) > 100_000:
+                _NORMALIZED_TOKENS.clear()
+            normalized = _NORMALIZED_TOKENS[token] = normalize_token(token)
+        if normalized:
+            tokens.append(normalized)
+    return tokens
+
+
+def expand_keywords(keywords):
+    """Query terms for a list of sector keywords, including their synonyms"""
+    terms = []
+    for keyword in keywords:
+        for phrase in SECTOR_SYNONYMS.get(keyword.lower(), (keyword,)):
+            terms.extend(tokenize(phrase))
+    return terms
+
+
+class RetrievalEngine:
+    """BM25 term matrix plus LSA embeddings over the investor documents"""
+
+    def __init__(self, vocab, idf, term_indptr, term_rows, term_weights, term_vectors, doc_vectors):
+        self.vocab = vocab
+        self.idf = idf
+        self.term_indptr = term_indptr
+        self.term_rows = term_rows
+        self.term_weights = term_weights
+        self.term_vectors = term_vectors
+        self.doc_vectors = doc_vectors
+
+    @classmethod
+    def build(cls, documents, embedding_documents):
+        """Build from one BM25 text per investor and one (thesis-only) text per investor for embeddings"""
+        doc_tokens = [tokenize(text) for text in documents]
+        term_counts = {}
+        for row, tokens in enumerate(doc_tokens):
+            for token in tokens:
+                counts = term_counts.setdefault(token, {})
+                counts[row] = counts.get(row, 0) + 1
+        vocab_list = sorted(term_counts)
+        vocab = {term: i for i, term in enumerate(vocab_list)}
+
+        size = len(documents)
+        lengths = np.array([len(tokens) for tokens in doc_tokens], dtype=np.float32)
+        avg_length = float(lengths.mean()) if size and lengths.mean() > 0 else 1.0
+
+        idf = np.empty(len(vocab_list), dtype=np.float32)
+        term_indptr = np.zeros(len(vocab_list) + 1, dtype=np.uint32)
+        rows, weights = [], []
+        for i, term in enumerate(vocab_list):
+            counts = term_counts[term]
+            idf[i] = math.log(1 + (size - len(counts) + 0.5) / (len(counts) + 0.5))
+            term_rows = np.fromiter(counts.keys(), dtype=np.uint32, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[term_rows] / avg_length)
+            rows.append(term_rows)
+            weights.append(tf * (BM25_K1 + 1) / (tf + norm))
+            term_indptr[i + 1] = term_indptr[i] + len(counts)
+
+        term_vectors, doc_vectors = build_embeddings(embedding_documents, vocab, idf)
+        return cls(
+            vocab,
+            idf,
+            term_indptr,
+            np.concatenate(rows) if rows else np.zeros(0, dtype=np.uint32),
+            np.concatenate(weights).astype(np.float32) if weights else np.zeros(0, dtype=np.float32),
+            term_vectors,
+            doc_vectors
+        )
+
+    def query_term_ids(self, terms):
+        return sorted({self.vocab[term] for term in terms if term in self.vocab})
+
+    def bm25(self, term_ids):
+        """BM25 score of every document for the query terms, in one weighted bincount"""
+        size = self.doc_vectors.shape[0]
+        if not term_ids:
+            return np.zeros(size, dtype=np.float32)
+        spans = [(int(self.term_indptr[i]), int(self.term_indptr[i + 1])) for i in term_ids]
+        rows = np.concatenate([self.term_rows[start:end] for start, end in spans])
+        weights = np.concatenate([self.term_weights[start:end] * self.idf[i] for i, (start, end) in zip(term_ids, spans)])
+        return np.bincount(rows, weights=weights, minlength=size).astype(np.float32)
+
+    def similarity(self, term_ids):
+        """Cosine similarity of every document's embedding to the query's folded-in embedding"""
+        query = (self.term_vectors[term_ids] * self.idf[term_ids, None]).sum(axis=0)
+        norm = np.linalg.norm(query)
+        if not term_ids or norm == 0:
+            return np.zeros(self.doc_vectors.shape[0], dtype=np.float32)
+        return self.doc_vectors @ (query / norm)
+
+    def relevance(self, terms):
+        """Fused BM25 + embedding relevance of every document in [0, 1]"""
+        term_ids = self.query_term_ids(terms)
+        bm25 = self.bm25(term_ids)
+        top = bm25.max() if bm25.size else 0
+        if top > 0:
+            bm25 /= top
+        similarity = np.clip(
+            (self.similarity(term_ids) - MIN_EMBEDDING_SIMILARITY) / (1 - MIN_EMBEDDING_SIMILARITY), 0, 1
+        )
+        return (1 - EMBEDDING_WEIGHT) * bm25 + EMBEDDING_WEIGHT * similarity
+
+
+def tfidf_matrix(doc_columns, rows, column_idf):
+    """Row-normalized log TF-IDF matrix of the given documents, from their column ids"""
+    matrix = np.zeros((len(rows), len(column_idf)), dtype=np.float32)
+    row_ids = np.repeat(np.arange(len(rows)), [len(doc_columns[row]) for row in rows])
+    column_ids = np.fromiter((column for row in rows for column in doc_columns[row]), dtype=np.intp, count=len(row_ids))
+    np.add.at(matrix, (row_ids, column_ids), 1)
+    np.log1p(matrix, out=matrix)
+    matrix *= column_idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def build_embeddings(documents, vocab, idf, dimensions=EMBEDDING_DIMENSIONS, seed=0):
+    """LSA term and document vectors from a randomized truncated SVD of the TF-IDF matrix"""
+    doc_tokens = [[token for token in tokenize(text) if token in vocab] for text in documents]
+    doc_freq = {}
+    for tokens in doc_tokens:
+        for token in set(tokens):
+            doc_freq[token] = doc_freq.get(token, 0) + 1
+    # Terms used by a single document carry no co-occurrence signal, and empty documents none at all
+    column_terms = sorted(t for t, count in doc_freq.items() if count > 1)
+    columns = {token: i for i, token in enumerate(column_terms)}
+    doc_columns = [[columns[token] for token in tokens if token in columns] for tokens in doc_tokens]
+    rows = [row for row, row_columns in enumerate(doc_columns) if row_columns]
+
+    term_vectors = np.zeros((len(vocab), 0), dtype=np.float32)
+    doc_vectors = np.zeros((len(documents), 0), dtype=np.float32)
+    dimensions = min(dimensions, len(rows), len(columns))
+    if dimensions == 0:
+        return term_vectors, doc_vectors
+
+    rng = np.random.default_rng(seed)
+    fit_rows = rows
+    if len(rows) > EMBEDDING_FIT_DOCS:
+        fit_rows = sorted(rng.choice(rows, EMBEDDING_FIT_DOCS, replace=False))
+    column_idf = idf[[vocab[token] for token in column_terms]]
+    matrix = tfidf_matrix(doc_columns, fit_rows, column_idf)
+
+    sample = matrix @ rng.standard_normal((matrix.shape[1], min(dimensions + 8, matrix.shape[1])), dtype=np.float32)
+    for _ in range(2):
+        sample, _ = np.linalg.qr(matrix @ (matrix.T @ sample))
+    basis, _ = np.linalg.qr(sample)
+    _, _, vt = np.linalg.svd(basis.T @ matrix, full_matrices=False)
+    components = vt[:dimensions].T
+
+    term_vectors = np.zeros((len(vocab), dimensions), dtype=np.float32)
+    term_vectors[[vocab[token] for token in column_terms]] = components
+    doc_vectors = np.zeros((len(documents), dimensions), dtype=np.float32)
+    for start in range(0, len(rows), EMBEDDING_CHUNK_DOCS):
+        chunk = rows[start:start + EMBEDDING_CHUNK_DOCS]
+        embedded = tfidf_matrix(doc_columns, chunk, column_idf) @ components
+        norms = np.linalg.norm(embedded, axis=1, keepdims=True)
+        np.divide(embedded, norms, out=embedded, where=norms > 0)
+        doc_vectors[chunk] = embedded
+    return term_vectors, doc_vectors
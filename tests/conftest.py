@@ -0,0 +1,16 @@
+import pytest
+
+import api_gateway
+from tests.mock_api import MockApi
+
+
+@pytest.fixture
+def mock_api():
+    with MockApi() as api:
+        yield api
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    """Keep the jittered backoff short; retry-after from the server still applies"""
+    monkeypatch.setattr(api_gateway, "RETRY_BASE_DELAY", 0.01)
@@ -0,0 +1,231 @@
+"""Local stand-in for the Messages API, for exercising ApiGateway without the network.
+
+Point ApiGateway (or ANTHROPIC_BASE_URL) at MockApi.url. Each POST /v1/messages
+takes the next scripted response, if any, and otherwise answers with a short
+reply, streamed as server-sent events when the request asks for a stream.
+Message batches (/v1/messages/batches) end after batch_polls retrievals, and
+every request in them succeeds except the custom_ids in failing_custom_ids:
+
+    with MockApi() as api:
+        api.script(429, headers={"retry-after": "1"})
+        api.script(529)
+        gateway = ApiGateway(api_key="test", base_url=api.url)
+        gateway.create(model=..., max_tokens=..., messages=...)  # succeeds on the third try
+
+Run it on its own to try the app against it:
+
+    python -m tests.mock_api 8766
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY_TEXT = "Hello from the mock API."
+
+ERROR_TYPES = {
+    400: "invalid_request_error",
+    429: "rate_limit_error",
+    500: "api_error",
+    503: "api_error",
+    529: "overloaded_error",
+}
+
+
+def message_body(model, text=REPLY_TEXT):
+    return {
+        "id": "msg_mock",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    }
+
+
+def message_events(model, text=REPLY_TEXT):
+    """The server-sent events of a streamed reply"""
+    message = {**message_body(model, text), "content": [], "stop_reason": None}
+    yield "message_start", {"type": "message_start", "message": message}
+    yield "content_block_start", {"type": "content_block_start", "index": 0,
+                                  "content_block": {"type": "text", "text": ""}}
+    for i, word in enumerate(text.split(" ")):
+        yield "content_block_delta", {"type": "content_block_delta", "index": 0,
+                                      "delta": {"type": "text_delta", "text": word if i == 0 else " " + word}}
+    yield "content_block_stop", {"type": "content_block_stop", "index": 0}
+    yield "message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                            "usage": {"output_tokens": 5}}
+    yield "message_stop", {"type": "message_stop"}
+
+
+class MockApi:
+    """Threaded HTTP server answering /v1/messages from a script of responses"""
+
+    def __init__(self, port=0):
+        self.responses = deque()
+        self.requests = []
+        self.batches = {}
+        self.batch_polls = 1
+        self.failing_custom_ids = set()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self.handler_class())
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def script(self, status, headers=None, body=None):
+        """Answer the next unscripted request with status (an error body by default)"""
+        if body is None:
+            body = {"type": "error", "error": {"type": ERROR_TYPES.get(status, "api_error"), "message": "mock error"}}
+        with self.lock:
+            self.responses.append((status, headers or {}, body))
+
+    def next_response(self):
+        with self.lock:
+            return self.responses.popleft() if self.responses else None
+
+    def record(self, path, body):
+        with self.lock:
+            self.requests.append({"time": time.monotonic(), "path": path, "body": body})
+
+    def batch_body(self, batch_id, poll=False):
+        with self.lock:
+            batch = self.batches[batch_id]
+            if poll:
+                batch["polls"] += 1
+            ended = batch["polls"] >= self.batch_polls
+            total = len(batch["requests"])
+            errored = sum(request["custom_id"] in self.failing_custom_ids for request in batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else total,
+                "succeeded": total - errored if ended else 0,
+                "errored": errored if ended else 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": "2026-01-01T00:00:00Z",
+            "expires_at": "2026-01-02T00:00:00Z",
+            "ended_at": "2026-01-01T00:01:00Z" if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def batch_results(self, batch_id):
+        """The results of an ended batch, one JSON line per request"""
+        lines = []
+        for request in self.batches[batch_id]["requests"]:
+            if request["custom_id"] in self.failing_custom_ids:
+                result = {"type": "errored", "error": {"type": "error", "error": {
+                    "type": "invalid_request_error", "message": "mock batch failure"}}}
+            else:
+                result = {"type": "succeeded",
+                          "message": message_body(request["params"]["model"], f"Review of {request['custom_id']}")}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}) + "\n")
+        return "".join(lines).encode("utf-8")
+
+    def handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def send_json(self, status, body, headers=()):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                for name, value in dict(headers).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def send_events(self, events):
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("connection", "close")
+                self.end_headers()
+                for event, data in events:
+                    self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+                self.close_connection = True
+
+            def not_found(self):
+                self.send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+                api.record(self.path, body)
+                path = self.path.split("?")[0]
+                if path == "/v1/messages/batches":
+                    with api.lock:
+                        batch_id = f"msgbatch_mock{len(api.batches) + 1}"
+                        api.batches[batch_id] = {"requests": body["requests"], "polls": 0}
+                    self.send_json(200, api.batch_body(batch_id))
+                    return
+                if path != "/v1/messages":
+                    self.not_found()
+                    return
+                scripted = api.next_response()
+                if scripted is not None:
+                    status, headers, response = scripted
+                    self.send_json(status, response, headers)
+                elif body.get("stream"):
+                    self.send_events(message_events(body["model"]))
+                else:
+                    self.send_json(200, message_body(body["model"]))
+
+            def do_GET(self):
+                api.record(self.path, None)
+                parts = self.path.split("?")[0].strip("/").split("/")
+                if parts[:3] != ["v1", "messages", "batches"] or len(parts) < 4 or parts[3] not in api.batches:
+                    self.not_found()
+                elif len(parts) == 4:
+                    self.send_json(200, api.batch_body(parts[3], poll=True))
+                elif parts[4:] == ["results"] and api.batch_body(parts[3])["processing_status"] == "ended":
+                    data = api.batch_results(parts[3])
+                    self.send_response(200)
+                    self.send_header("content-type", "application/binary")
+                    self.send_header("content-length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                else:
+                    self.not_found()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mock-api", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8766
+    api = MockApi(port)
+    print(f"Mock Messages API on {api.url}; set ANTHROPIC_BASE_URL to use it", flush=True)
+    api.server.serve_forever()
@@ -0,0 +1,62 @@
+import pytest
+
+from advisor import chat_context, detect_raise_amount, match_deck_investors
+
+
+class RecordingIndex:
+    """Stands in for InvestorIndex, recording each search's arguments"""
+
+    def __init__(self):
+        self.searches = []
+
+    def search(self, **kwargs):
+        self.searches.append(kwargs)
+        return []
+
+
+@pytest.mark.parametrize("text, amount", [
+    ("We're raising £500k", 635_000.0),
+    ("raising a $1.5m seed", 1_500_000.0),
+    ("$750k pre-seed round", 750_000.0),
+    ("we raised $200k last year and are now raising $2m", 2_000_000.0),
+])
+def test_detect_raise_amount(text, amount):
+    assert detect_raise_amount(text) == amount
+
+
+@pytest.mark.parametrize("text", [
+    "We are looking for 10k beta users",
+    "Raising awareness among 2m parents",
+    "We raised $200k from angels",
+    "raising in 2025",
+])
+def test_detect_raise_amount_ignores_amounts_that_are_not_round_sizes(text):
+    assert detect_raise_amount(text) is None
+
+
+def test_stated_raise_filters_investors():
+    index = RecordingIndex()
+    chat_context("Find investors for my seed fintech, we're raising $1m", None, [], index)
+    assert index.searches[0]["raise_amount"] == 1_000_000.0
+    assert index.searches[0]["strict_raise"]
+
+
+def test_raise_from_deck_only_ranks_investors():
+    index = RecordingIndex()
+    deck = "--- Page 1 ---\nSeed fintech. We are raising $3m to reach 10k customers."
+    chat_context("Find investors for my startup", deck, [], index)
+    assert index.searches[0]["raise_amount"] == 3_000_000.0
+    assert not index.searches[0]["strict_raise"]
+
+    match_deck_investors(deck, index)
+    assert not index.searches[1]["strict_raise"]
+
+
+def test_geography_filters_only_when_named_as_a_location():
+    index = RecordingIndex()
+    chat_context("Hi, I am Jordan. Find investors for my seed fintech", None, [], index)
+    assert not index.searches[0]["strict_geography"]
+
+    chat_context("Find investors for my seed fintech, we are based in Jordan", None, [], index)
+    assert index.searches[1]["geography"] == "Jordan"
+    assert index.searches[1]["strict_geography"]
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import anthropic
+import pytest
+
+from api_gateway import ApiGateway, FairSemaphore, GatewayBusyError
+from tests.mock_api import REPLY_TEXT
+
+REQUEST = {"model": "claude-test", "max_tokens": 16, "messages": [{"role": "user", "content": "Hi"}]}
+
+
+def reply_text(message):
+    return "".join(block.text for block in message.content if block.type == "text")
+
+
+def gateway_for(api, **kwargs):
+    return ApiGateway(api_key="test", base_url=api.url, **kwargs)
+
+
+def test_create_retries_rate_limited_and_overloaded_responses(mock_api):
+    mock_api.script(429)
+    mock_api.script(529)
+    message = gateway_for(mock_api).create(**REQUEST)
+    assert reply_text(message) == REPLY_TEXT
+    assert len(mock_api.requests) == 3
+
+
+def test_retry_waits_for_retry_after(mock_api):
+    mock_api.script(429, headers={"retry-after": "0.5"})
+    gateway_for(mock_api).create(**REQUEST)
+    first, second = mock_api.requests
+    assert second["time"] - first["time"] >= 0.5
+
+
+def test_gives_up_after_max_retries(mock_api):
+    for _ in range(5):
+        mock_api.script(529)
+    with pytest.raises(anthropic.APIStatusError) as error:
+        gateway_for(mock_api, max_retries=2).create(**REQUEST)
+    assert error.value.status_code == 529
+    assert len(mock_api.requests) == 3
+
+
+def test_client_errors_are_not_retried(mock_api):
+    mock_api.script(400)
+    with pytest.raises(anthropic.BadRequestError):
+        gateway_for(mock_api).create(**REQUEST)
+    assert len(mock_api.requests) == 1
+
+
+def test_stream_retries_opening_the_stream(mock_api):
+    mock_api.script(529)
+    with gateway_for(mock_api).stream(**REQUEST) as stream:
+        text = "".join(stream.text_stream)
+    assert text == REPLY_TEXT
+    assert len(mock_api.requests) == 2
+
+
+def test_slot_is_released_after_a_failed_request(mock_api):
+    mock_api.script(400)
+    gateway = gateway_for(mock_api, max_concurrency=1, queue_timeout=1)
+    with pytest.raises(anthropic.BadRequestError):
+        gateway.create(**REQUEST)
+    assert reply_text(gateway.create(**REQUEST)) == REPLY_TEXT
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_fair_semaphore_hands_out_slots_in_arrival_order():
+    semaphore = FairSemaphore(1)
+    assert semaphore.acquire()
+    order = []
+
+    def waiter(i):
+        semaphore.acquire()
+        order.append(i)
+        semaphore.release()
+
+    threads = []
+    for i in range(8):
+        thread = threading.Thread(target=waiter, args=(i,))
+        thread.start()
+        threads.append(thread)
+        # Queue each waiter before the next one arrives
+        wait_until(lambda: semaphore.queued() == i + 1)
+    semaphore.release()
+    for thread in threads:
+        thread.join()
+    assert order == list(range(8))
+
+
+def test_fair_semaphore_timeout_leaves_the_queue():
+    semaphore = FairSemaphore(1)
+    assert semaphore.acquire()
+    start = time.monotonic()
+    assert not semaphore.acquire(timeout=0.1)
+    assert time.monotonic() - start >= 0.1
+    assert semaphore.queued() == 0
+    semaphore.release()
+    assert semaphore.acquire(timeout=0)
+
+
+def test_gateway_raises_busy_after_queue_timeout(mock_api):
+    gateway = gateway_for(mock_api, max_concurrency=1, queue_timeout=0.1)
+    with gateway.slot():
+        with pytest.raises(GatewayBusyError):
+            gateway.create(**REQUEST)
+    assert mock_api.requests == []
@@ -0,0 +1,27 @@
+import pytest
+
+from geography import detect_geography
+
+
+@pytest.mark.parametrize("text, geography", [
+    ("Find investors in Germany", ("Germany", True)),
+    ("We're based in Georgia", ("Georgia", True)),
+    ("investors in Jordan for a seed fintech", ("Jordan", True)),
+    ("Find UK investors", ("UK", True)),
+    ("London-based seed funds", ("London", True)),
+    ("A fintech for Germany and France", ("Germany", False)),
+    ("Our UK fintech", ("UK", False)),
+])
+def test_detect_geography(text, geography):
+    assert detect_geography(text) == geography
+
+
+@pytest.mark.parametrize("text", [
+    "Hi, I am Jordan. Find investors for my seed fintech",
+    "Chad here, looking for seed investors",
+    "Georgia and I are building a fintech",
+    "We help farmers raise turkey flocks",
+    "we sell to the eu market",
+])
+def test_detect_geography_ignores_names_that_are_not_locations(text):
+    assert detect_geography(text) == (None, False)
@@ -0,0 +1,22 @@
+"""Everything but app.py must import without Streamlit.
+
+Batch jobs, benchmarks, OCR worker processes and these tests drive the modules
+headlessly, so only app.py may import streamlit.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = sorted(path.stem for path in ROOT.glob("*.py") if path.name != "app.py")
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_imports_without_streamlit(module):
+    # A None entry in sys.modules makes any import of streamlit raise ImportError
+    code = f"import sys; sys.modules['streamlit'] = None; import {module}"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
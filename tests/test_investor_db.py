@@ -0,0 +1,20 @@
+import json
+
+from investor_db import load_investor_index
+
+
+def test_json_fallback_writes_compiled_db(tmp_path):
+    json_path, db_path = tmp_path / "investors.json", tmp_path / "investors.db"
+    with open("investors.json") as f:
+        json_path.write_text(json.dumps(json.load(f)[:200]))
+
+    built = load_investor_index(str(json_path), str(db_path))
+    assert built.investors.buffer is None
+    assert db_path.exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+    mapped = load_investor_index(str(json_path), str(db_path))
+    assert mapped.investors.buffer is not None
+    query = {"stage": "seed", "sector_keywords": ["fintech"], "max_results": 10}
+    assert ([investor["name"] for investor in mapped.search(**query)]
+            == [investor["name"] for investor in built.search(**query)])
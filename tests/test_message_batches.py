@@ -0,0 +1,43 @@
+from api_gateway import ApiGateway
+from message_batches import BatchState, finish_batch, run_batch, submit_batch
+
+PARAMS = {"model": "claude-test", "max_tokens": 16, "messages": [{"role": "user", "content": "Review my deck"}]}
+
+
+def batch_inputs(*custom_ids):
+    records = {custom_id: {"path": f"{custom_id}.pdf", "digest": custom_id} for custom_id in custom_ids}
+    requests = {custom_id: PARAMS for custom_id in custom_ids}
+    return records, requests
+
+
+def test_run_batch_writes_every_record_and_clears_state(mock_api, tmp_path):
+    mock_api.batch_polls = 3
+    mock_api.failing_custom_ids = {"deck-b"}
+    state = BatchState(str(tmp_path / "results.jsonl.batch"))
+    written = []
+    records, requests = batch_inputs("deck-a", "deck-b")
+
+    run_batch(ApiGateway(api_key="test", base_url=mock_api.url), state, records, requests, written.append,
+              poll_interval=0.01)
+
+    by_path = {record["path"]: record for record in written}
+    assert by_path["deck-a.pdf"]["review"] == "Review of deck-a"
+    assert by_path["deck-b.pdf"]["error"] == "Review failed: mock batch failure"
+    assert state.load() is None
+    # Polled until the batch ended; the mock serves no results before then
+    assert mock_api.batches["msgbatch_mock1"]["polls"] >= 3
+
+
+def test_interrupted_batch_is_collected_without_resubmitting(mock_api, tmp_path):
+    gateway = ApiGateway(api_key="test", base_url=mock_api.url)
+    state = BatchState(str(tmp_path / "results.jsonl.batch"))
+    records, requests = batch_inputs("deck-a")
+    # A run that submitted its batch and then stopped
+    state.save(submit_batch(gateway, requests), records)
+
+    written = []
+    finish_batch(gateway, state, *state.load(), written.append, poll_interval=0.01)
+
+    assert [record["review"] for record in written] == ["Review of deck-a"]
+    assert len(mock_api.batches) == 1
+    assert state.load() is None
@@ -0,0 +1,15 @@
+from metrics import REGISTRY, export_metrics, span
+
+
+def test_spans_file_rotates_by_size(tmp_path):
+    REGISTRY.take_spans()
+    for _ in range(3):
+        with span("test_stage"):
+            pass
+        export_metrics(str(tmp_path), spans_max_bytes=1)
+
+    # Each export found a full file, so only the last batch is current and one is kept
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["metrics.prom", "spans.jsonl", "spans.jsonl.1"]
+    assert len((tmp_path / "spans.jsonl").read_text().splitlines()) == 1
+    assert len((tmp_path / "spans.jsonl.1").read_text().splitlines()) == 1
+    assert "copilot_stage_latency_seconds_count" in (tmp_path / "metrics.prom").read_text()
@@ -0,0 +1,383 @@
+"""Page styling and static HTML for the Streamlit UI.
+
+Kept out of app.py so the stylesheet is built once per process rather than on
+every script rerun.
+"""
+
+# Professional styling inspired by Claude's aesthetic
+APP_CSS = """
+<style>
+    /* Import clean fonts */
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&family=Source+Serif+4:wght@400;500;600&display=swap');
+    
+    /* Hide Streamlit branding */
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    header {visibility: hidden;}
+    
+    /* Main container styling */
+    .stApp {
+        background-color: #FDFCFB;
+    }
+    
+    .main .block-container {
+        max-width: 720px;
+        padding-top: 0.5rem;
+        padding-bottom: 1rem;
+    }
+    
+    /* Typography */
+    h1, h2, h3, h4, h5, h6 {
+        font-family: 'Source Serif 4', Georgia, serif !important;
+        color: #1a1a1a;
+    }
+    
+    p, span, div, input, textarea, button, label {
+        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif !important;
+    }
+    
+    /* Header styling */
+    .main-header {
+        text-align: center;
+        padding: 0.75rem 0 0.75rem 0;
+        border-bottom: 1px solid #E8E4E0;
+        margin-bottom: 1rem;
+    }
+    
+    .main-header h1 {
+        font-size: 1.75rem;
+        font-weight: 600;
+        color: #1a1a1a;
+        margin-bottom: 0.4rem;
+        letter-spacing: -0.02em;
+    }
+    
+    .main-header .subtitle {
+        font-size: 0.95rem;
+        color: #666;
+        font-weight: 400;
+        line-height: 1.5;
+        margin-bottom: 0.5rem;
+    }
+    
+    .main-header .header-disclaimer {
+        font-size: 0.75rem;
+        color: #999;
+        margin-top: 0.5rem;
+    }
+    
+    /* Upload hint */
+    .upload-hint {
+        font-size: 0.85rem;
+        color: #666;
+        margin-bottom: 0.5rem;
+        margin-top: 0.5rem;
+    }
+    
+    /* Upload section */
+    .upload-section {
+        background: #FFFFFF;
+        border: 1px solid #E8E4E0;
+        border-radius: 12px;
+        padding: 0.75rem;
+        margin-bottom: 0.75rem;
+    }
+    
+    .upload-label {
+        font-size: 0.875rem;
+        font-weight: 500;
+        color: #1a1a1a;
+        margin-bottom: 0.75rem;
+        display: flex;
+        align-items: center;
+        gap: 0.5rem;
+    }
+    
+    /* File uploader customization */
+    .stFileUploader {
+        background: transparent !important;
+    }
+    
+    .stFileUploader > div {
+        background: #FAFAFA !important;
+        border: 1px dashed #D4D0CC !important;
+        border-radius: 8px !important;
+        padding: 1rem !important;
+    }
+    
+    .stFileUploader > div:hover {
+        border-color: #B8977E !important;
+        background: #FDF9F6 !important;
+    }
+    
+    /* Action buttons */
+    .action-buttons {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 0.5rem;
+        margin: 0.75rem 0;
+    }
+    
+    .stButton > button {
+        font-family: 'Inter', sans-serif !important;
+        font-size: 0.9rem !important;
+        font-weight: 500 !important;
+        padding: 0.75rem 1rem !important;
+        border-radius: 8px !important;
+        border: 1px solid #E8E4E0 !important;
+        background: #FFFFFF !important;
+        color: #1a1a1a !important;
+        transition: all 0.15s ease !important;
+        width: 100% !important;
+    }
+    
+    .stButton > button:hover {
+        background: #FDF9F6 !important;
+        border-color: #B8977E !important;
+        color: #1a1a1a !important;
+    }
+    
+    .stButton > button:active {
+        background: #F5EDE6 !important;
+    }
+    
+    /* Secondary button (clear chat) */
+    .stButton > button[kind="secondary"] {
+        background: transparent !important;
+        border: 1px solid #E8E4E0 !important;
+        color: #666 !important;
+        font-size: 0.85rem !important;
+        padding: 0.5rem 1rem !important;
+    }
+    
+    .stButton > button[kind="secondary"]:hover {
+        background: #F5F5F5 !important;
+        color: #1a1a1a !important;
+    }
+    
+    /* User message speech bubble */
+    .user-message {
+        background: #F0F0F0;
+        border-radius: 18px;
+        padding: 0.75rem 1rem;
+        margin: 1rem 0;
+        max-width: 85%;
+        margin-left: auto;
+        font-size: 0.95rem;
+        line-height: 1.5;
+        color: #1a1a1a;
+    }
+    
+    /* Assistant response container */
+    .assistant-container {
+        margin: 1rem 0;
+    }
+    
+    /* Make avatar image smaller and aligned left */
+    .assistant-container img {
+        border-radius: 50%;
+        margin-bottom: 0.5rem;
+    }
+    
+    /* Chat messages - hide default styling */
+    .stChatMessage {
+        background: transparent !important;
+        border: none !important;
+        padding: 1rem 0 !important;
+    }
+    
+    .stChatMessage [data-testid="StyledLinkIconContainer"] {
+        display: none !important;
+    }
+    
+    /* User message */
+    [data-testid="stChatMessageContent"]:has(> div > p) {
+        font-size: 0.95rem !important;
+        line-height: 1.6 !important;
+    }
+    
+    /* Chat input */
+    .stChatInput {
+        border-top: 1px solid #E8E4E0;
+        padding-top: 0.75rem;
+        margin-top: 0.75rem;
+    }
+    
+    .stChatInput > div {
+        background: #FFFFFF !important;
+        border: 1px solid #E8E4E0 !important;
+        border-radius: 12px !important;
+        padding: 0.25rem !important;
+    }
+    
+    .stChatInput textarea {
+        font-family: 'Inter', sans-serif !important;
+        font-size: 0.95rem !important;
+        color: #1a1a1a !important;
+    }
+    
+    .stChatInput textarea::placeholder {
+        color: #999 !important;
+    }
+    
+    /* Success/info/warning messages */
+    .stSuccess, .stInfo, .stWarning, .stError {
+        font-size: 0.875rem !important;
+        border-radius: 8px !important;
+    }
+    
+    .stSuccess {
+        background-color: #F0F9F4 !important;
+        border: 1px solid #B8DBCA !important;
+        color: #1a5d36 !important;
+    }
+    
+    .stInfo {
+        background-color: #F5F5F5 !important;
+        border: 1px solid #E0E0E0 !important;
+        color: #555 !important;
+    }
+    
+    .stWarning {
+        background-color: #FFF9F0 !important;
+        border: 1px solid #F0D9B5 !important;
+        color: #8B6914 !important;
+    }
+    
+    /* Spinner */
+    .stSpinner > div {
+        border-color: #B8977E !important;
+    }
+    
+    /* Footer */
+    .footer {
+        text-align: center;
+        padding: 1rem 0 0.5rem 0;
+        margin-top: 1rem;
+        border-top: 1px solid #E8E4E0;
+    }
+    
+    .footer p {
+        font-size: 0.85rem;
+        color: #888;
+        margin: 0.2rem 0;
+        line-height: 1.5;
+    }
+    
+    .footer a {
+        color: #B8977E;
+        text-decoration: none;
+        font-weight: 500;
+    }
+    
+    .footer a:hover {
+        color: #8B6B4A;
+        text-decoration: underline;
+    }
+    
+    .footer .tagline {
+        font-family: 'Source Serif 4', Georgia, serif;
+        font-style: italic;
+        color: #666;
+        font-size: 0.9rem;
+        margin-top: 0.25rem;
+    }
+    
+    /* Section divider */
+    .section-divider {
+        border: none;
+        border-top: 1px solid #E8E4E0;
+        margin: 1rem 0;
+    }
+    
+    /* Prompt label */
+    .prompt-label {
+        font-size: 0.875rem;
+        font-weight: 500;
+        color: #555;
+        margin-bottom: 0.5rem;
+    }
+    
+    /* Hide default streamlit elements */
+    .stDeployButton {display: none;}
+    
+    /* Hide empty containers */
+    .stChatInput:empty, 
+    .element-container:empty,
+    .stMarkdown:empty {
+        display: none !important;
+    }
+    
+    /* Fix chat input container */
+    [data-testid="stChatInput"] {
+        background: transparent !important;
+        border: none !important;
+        box-shadow: none !important;
+    }
+    
+    [data-testid="stChatInput"] > div {
+        background: #FFFFFF !important;
+        border: 1px solid #E8E4E0 !important;
+        border-radius: 12px !important;
+    }
+    
+    /* Sidebar styling */
+    [data-testid="stSidebar"] {
+        background: #FAFAFA !important;
+        border-right: 1px solid #E8E4E0 !important;
+    }
+    
+    [data-testid="stSidebar"] .stMarkdown {
+        font-size: 0.875rem !important;
+    }
+    
+    /* Markdown in responses */
+    .stMarkdown {
+        font-size: 0.95rem;
+        line-height: 1.7;
+        color: #1a1a1a;
+    }
+    
+    .stMarkdown h3 {
+        font-size: 1.1rem;
+        margin-top: 1.5rem;
+        margin-bottom: 0.75rem;
+    }
+    
+    .stMarkdown ul, .stMarkdown ol {
+        margin: 0.75rem 0;
+        padding-left: 1.5rem;
+    }
+    
+    .stMarkdown li {
+        margin: 0.4rem 0;
+    }
+    
+    .stMarkdown strong {
+        font-weight: 600;
+        color: #1a1a1a;
+    }
+    
+    .stMarkdown code {
+        background: #F5F5F5;
+        padding: 0.15rem 0.4rem;
+        border-radius: 4px;
+        font-size: 0.85em;
+    }
+</style>
+"""
+
+HEADER_HTML = """
+<div class="main-header">
+    <h1>🚀 Fundraising Co-Pilot</h1>
+    <p class="subtitle">AI-powered fundraising decision support,<br>built by an investor for underestimated founders</p>
+    <p class="header-disclaimer">Decision support, not advice. No guarantees in fundraising.</p>
+</div>
+"""
+
+FOOTER_HTML = """
+<div class="footer">
+    <p>Built by <a href="https://thefundraisingaccelerator.com" target="_blank">The Fundraising Accelerator</a></p>
+    <p class="tagline">Your network should not determine your net worth.</p>
+</div>
+"""